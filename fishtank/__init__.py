@@ -9,16 +9,44 @@ An interactive fishtank for your terminal.
 
 import os
 import sys
-import json
+from time import perf_counter
 from typing import Any, Tuple
 
+# used by --startup-timing
+IMPORT_TIME = perf_counter()
+
+from .log import LOGGER, DEBUG
+
 __version__ = "0.0.0"
 usage_data = f"""\
 fishtank {__version__}:
 
 - fishtank: run fishtank
 - fishtank -h (--help): print this text
-- fishtank -g (--generate-layouts): force-generate fishtank/layouts files
+- fishtank -g (--generate-layouts): force-generate fishtank/layouts files, which
+    are otherwise only regenerated when their generator changes
+- fishtank --benchmark [NUM]: time NUM updates of the interactive tank
+- fishtank --benchmark-suite [--scenario A,B] [--json OUT] [--baseline FILE] [--memory]:
+    run headless benchmark scenarios, optionally comparing against a baseline
+    and printing per-class memory reports
+- fishtank --microbench [NAME,NAME] [--sizes 10,100] [--json OUT]:
+    time core primitives at the given sizes
+- fishtank -j (--journal) FILE: journal the tank to FILE, restoring from it if possible
+- fishtank --record FILE: record rendered frames to FILE
+- fishtank --play FILE [--speed X] [--seek FRAME]: play back a recording
+- fishtank --trace FILE: write per-phase timings to FILE as Chrome trace JSON
+- fishtank --profile FILE: sample stacks while running, write them to FILE as
+    collapsed stacks and print the top self-time functions on exit
+- fishtank --rewind SECONDS: keep the last SECONDS of the tank, step through them with [ and ]
+- fishtank --metrics FILE [--metrics-socket PATH]: export OpenMetrics text to FILE
+    every 10 seconds, and/or serve it over HTTP on the Unix socket PATH
+- fishtank --log FILE [--log-level LEVEL]: write the log to FILE instead of
+    ~/.cache/fishtank/log, only keeping records of LEVEL (DEBUG, INFO, ...) or above
+- fishtank --startup-timing: print how long each startup phase and the first frame took
+- fishtank --memory-budget MB: compact caches & refuse spawns when the tank
+    is estimated to use more than MB megabytes
+- fishtank --world-scale N: make the tank N times as wide & as tall as the screen,
+    moving the view with the arrow keys and zooming out/in with - and =
 """
 
 
@@ -28,9 +56,11 @@ def to_local(subpath: str) -> str:
     return os.path.join(os.path.dirname(__file__), subpath)
 
 
-with open(to_local("data/species.json"), "r") as species_file:
-    SPECIES_DATA = json.load(species_file)
-del species_file
+def to_cache(subpath: str) -> str:
+    """Return joined path of the user's fishtank cache directory and subpath"""
+
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache, "fishtank", subpath)
 
 
 # pylint: disable=protected-access
@@ -52,24 +82,13 @@ def get_caller(depth: int = 1) -> str:
     return type(obj).__name__ + "." + method if obj else method
 
 
+# pylint: disable=unused-argument
 def dbg(*args: Any, end: str = "\n") -> None:
-    """Write information to log file"""
+    """Log args at DEBUG level, see fishtank.log for leveled logging
+
+    The arguments are only converted to strings by the log writer."""
 
     if args == tuple():
         args = (get_caller(2),)
 
-    string = " ".join([str(a) for a in args])
-
-    frame = sys._getframe()
-    if frame is None:
-        return
-
-    frame_back = frame.f_back
-    if frame_back is None:
-        return
-
-    filename = frame_back.f_code.co_filename.split("/")[-1]
-    lineno = frame_back.f_lineno
-
-    with open(to_local("log"), "a") as logfile:
-        logfile.write(f"{filename}/{get_caller(0)}:{lineno} : " + string + end)
+    LOGGER.log(DEBUG, " ".join(["%s"] * len(args)), *args, depth=2)
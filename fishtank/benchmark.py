@@ -0,0 +1,262 @@
+"""
+fishtank.benchmark
+------------------
+author: bczsalba
+
+
+This module provides a headless, scenario-based benchmark suite.
+
+Every scenario builds its own Aquarium writing to os.devnull, populates it
+with fish of every FishType that has species, optionally drops bursts of food
+and times a fixed number of Aquarium.update calls. Scenarios are seeded, so
+runs of the same version are comparable.
+
+Results are a JSON-serializable dict, which can be saved and later used as a
+baseline: `fishtank --benchmark-suite --json out.json --baseline old.json`
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import random
+import platform
+import tracemalloc
+from time import perf_counter
+from typing import Any, Optional, TextIO
+
+from . import __version__
+from . import memory
+from .camera import Camera
+from .view import View, TankView
+from .classes import Aquarium
+from .enums import FishType
+from .species import get_registry
+from .stats import summarize
+
+# metrics compared against baselines; all of them are better when lower
+COMPARED_METRICS = ["mean", "p95", "p99"]
+
+
+class Scenario:
+    """A single benchmarked tank setup"""
+
+    # pylint: disable=too-few-public-methods, too-many-arguments
+    def __init__(
+        self,
+        name: str,
+        fish_per_type: int,
+        size: tuple[int, int],
+        ticks: int = 300,
+        food_every: int = 0,
+        food_burst: int = 0,
+        view: Optional[tuple[int, int]] = None,
+    ) -> None:
+        """Set up object
+
+        When food_every is non-zero, food_burst pellets are added every
+        food_every ticks. With a view, the tank is drawn through a Camera of
+        that size, which also limits the fish given full updates."""
+
+        self.name = name
+        self.fish_per_type = fish_per_type
+        self.size = size
+        self.ticks = ticks
+        self.food_every = food_every
+        self.food_burst = food_burst
+        self.view = view
+
+
+SCENARIOS = [
+    Scenario("idle_tiny", fish_per_type=2, size=(30, 10)),
+    Scenario("idle_small", fish_per_type=10, size=(70, 25)),
+    Scenario("idle_large", fish_per_type=100, size=(200, 60)),
+    Scenario("crowded", fish_per_type=500, size=(200, 60), ticks=100),
+    Scenario("chasing", fish_per_type=30, size=(120, 40), food_every=10, food_burst=5),
+    Scenario(
+        "food_burst", fish_per_type=30, size=(120, 40), food_every=100, food_burst=100
+    ),
+    Scenario(
+        "flakes", fish_per_type=30, size=(120, 40), food_every=300, food_burst=5000
+    ),
+    Scenario("world", fish_per_type=1000, size=(1200, 450), ticks=100, view=(120, 45)),
+]
+
+
+def get_species_by_type() -> dict[FishType, list[str]]:
+    """Return species names grouped by their FishType"""
+
+    return get_registry().by_type()
+
+
+def build_tank(scenario: Scenario, output: TextIO) -> View:
+    """Create & populate the tank of a scenario, return the view drawing it"""
+
+    width, height = scenario.size
+    aquarium = Aquarium(width=width, height=height)
+    aquarium.fps = 25
+
+    view: View
+    if scenario.view is not None:
+        view = aquarium.camera = Camera(aquarium, *scenario.view)
+        aquarium.path_limit = aquarium.max_path_length = scenario.view[0]
+    else:
+        view = TankView(aquarium)
+
+    view.output = output
+
+    registry = get_registry()
+    for names in get_species_by_type().values():
+        # some FishTypes have no species yet
+        if len(names) == 0:
+            continue
+
+        aquarium.add_many(
+            registry.random(names[i % len(names)])
+            for i in range(scenario.fish_per_type)
+        )
+
+    return view
+
+
+def tick(view: View, scenario: Scenario, index: int) -> None:
+    """Add food if due, then update & draw the tank of view"""
+
+    if scenario.food_every and index % scenario.food_every == 0:
+        view.aquarium.add_food_burst(scenario.food_burst)
+
+    view.update()
+
+
+def run_scenario(scenario: Scenario, seed: int = 0) -> dict[str, Any]:
+    """Run a scenario, return its results"""
+
+    with open(os.devnull, "w", encoding="utf-8") as output:
+        random.seed(seed)
+        view = build_tank(scenario, output)
+
+        durations = []
+        frame_bytes = []
+        for i in range(scenario.ticks):
+            start = perf_counter()
+            tick(view, scenario, i)
+            durations.append(perf_counter() - start)
+            frame_bytes.append(len(view.last_frame.encode()))
+
+        estimate = memory.estimate(view.aquarium)
+
+        # tracemalloc slows everything down, so memory is measured in a separate run
+        random.seed(seed)
+        tracemalloc.start()
+        view = build_tank(scenario, output)
+        for i in range(min(scenario.ticks, 50)):
+            tick(view, scenario, i)
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+    frame_times = summarize(durations)
+    return {
+        "ticks": scenario.ticks,
+        "objects": len(view.aquarium.objects),
+        "size": list(scenario.size),
+        "frame_time": frame_times,
+        "ticks_per_second": 1 / frame_times["mean"],
+        "bytes_per_frame": summarize([float(count) for count in frame_bytes]),
+        "peak_memory": peak,
+        "memory": estimate,
+        "allocation_sites": memory.traced_sites(snapshot),
+    }
+
+
+def run_suite(
+    names: Optional[list[str]] = None,
+    output: Optional[TextIO] = sys.stderr,
+    show_memory: bool = False,
+) -> dict[str, Any]:
+    """Run all scenarios (or the ones in names), return results
+
+    Progress is printed to output, so stdout can be used for the results.
+    With show_memory, memory reports of every scenario are printed as well."""
+
+    results: dict[str, Any] = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "scenarios": {},
+    }
+
+    for scenario in SCENARIOS:
+        if names is not None and scenario.name not in names:
+            continue
+
+        if output is not None:
+            print(f"running {scenario.name} ... ", end="", flush=True, file=output)
+
+        results["scenarios"][scenario.name] = result = run_scenario(scenario)
+
+        if output is not None:
+            print(f"{result['ticks_per_second']:.1f} ticks/s", file=output)
+
+        if output is not None and show_memory:
+            print(*memory.format_report(result["memory"]), sep="\n", file=output)
+            for site, size in result["allocation_sites"].items():
+                print(f"{site:<22} {size / 1024:>9.1f}KiB", file=output)
+
+    return results
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.1
+) -> list[str]:
+    """Return lines comparing results to baseline, marking regressions
+
+    A regression is any compared metric that is more than threshold
+    (relative) slower than in the baseline."""
+
+    lines = []
+    for name, result in results["scenarios"].items():
+        if (old := baseline["scenarios"].get(name)) is None:
+            lines.append(f"{name}: not in baseline")
+            continue
+
+        for metric in COMPARED_METRICS:
+            new_value = result["frame_time"][metric]
+            old_value = old["frame_time"][metric]
+            change = new_value / old_value - 1 if old_value else 0.0
+
+            mark = "REGRESSION" if change > threshold else ""
+            lines.append(
+                f"{name}.{metric}: {old_value * 1000:.3f}ms -> "
+                + f"{new_value * 1000:.3f}ms ({change:+.1%}) {mark}".rstrip()
+            )
+
+    return lines
+
+
+def main(
+    json_path: Optional[str] = None,
+    baseline_path: Optional[str] = None,
+    names: Optional[list[str]] = None,
+    show_memory: bool = False,
+) -> int:
+    """Run suite, write & compare results, return exit code"""
+
+    results = run_suite(names, show_memory=show_memory)
+
+    if json_path is not None:
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if baseline_path is None:
+        return 0
+
+    with open(baseline_path, "r", encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+
+    lines = compare(results, baseline)
+    print("\n".join(lines))
+
+    return 1 if any(line.endswith("REGRESSION") for line in lines) else 0
@@ -0,0 +1,276 @@
+"""
+fishtank.camera
+---------------
+author: bczsalba
+
+
+This module provides the viewport an Aquarium is drawn through.
+
+The Aquarium only simulates: its size is not limited by the terminal, and
+the positions of its objects are world coordinates. A Camera shows part of
+it inside a bordered frame on screen, and is what converts between world &
+screen coordinates.
+
+Only fish that intersect the view are drawn, found with Aquarium.fish_in,
+so fish outside of it are never touched by the renderer. Food is drawn once
+per cell, however many pellets are in it. The camera remembers what it drew,
+and erases exactly that before the next frame.
+
+When zoomed out, every screen cell shows zoom x zoom cells of the world, and
+fish are drawn as a single arrow pointing where they are heading.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
+from pytermgui import Container, padding_label
+
+from .classes import Boundary, Fish, Position
+from .particles import SKIN as FOOD_SKIN
+from .view import View
+
+if TYPE_CHECKING:
+    from .classes import Aquarium
+
+MAX_ZOOM = 16
+
+
+class Camera(View):
+    """Scrollable, zoomable view into an Aquarium"""
+
+    def __init__(self, aquarium: Aquarium, width: int, height: int) -> None:
+        """Set up object, showing the middle of aquarium in a frame of width x height"""
+
+        super().__init__(aquarium)
+        self.zoom = 1
+
+        self.frame = Container(width=width, height=height)
+        for i, char in enumerate("..''"):
+            self.frame.set_corner(i, char)
+
+        # the border takes up two rows of the height
+        for _ in range(height - 2):
+            self.frame += padding_label
+
+        repr(self.frame)
+        self.frame.center()
+
+        self.origin = Position()
+
+        startx, starty, endx, endy = aquarium.bounds
+        self.look_at(Position((startx + endx) // 2, (starty + endy) // 2))
+
+    @property
+    def left(self) -> int:
+        """Return the first screen column inside the frame"""
+
+        return int(self.frame.pos[0]) + 2
+
+    @property
+    def top(self) -> int:
+        """Return the first screen row inside the frame"""
+
+        return int(self.frame.pos[1]) + 2
+
+    @property
+    def columns(self) -> int:
+        """Return count of screen columns inside the frame
+
+        The last column is left out, as redrawing the frame doesn't clear it."""
+
+        return int(self.frame.width) - 2
+
+    @property
+    def rows(self) -> int:
+        """Return count of screen rows inside the frame"""
+
+        return int(self.frame.height) - 2
+
+    def get_center(self) -> Position:
+        """Return world position at the center of the view"""
+
+        return Position(
+            self.origin.x + self.columns * self.zoom // 2,
+            self.origin.y + self.rows * self.zoom // 2,
+        )
+
+    def look_at(self, center: Position) -> None:
+        """Move view so that center is in its middle, keeping it in the tank"""
+
+        startx, starty, endx, endy = self.aquarium.bounds
+        posx = center.x - self.columns * self.zoom // 2
+        posy = center.y - self.rows * self.zoom // 2
+
+        # the first & last cells of bounds are its borders
+        posx = max(min(posx, endx - self.columns * self.zoom), startx + 1)
+        posy = max(min(posy, endy - self.rows * self.zoom), starty + 1)
+
+        self.origin = Position(posx, posy)
+        self.invalidate()
+
+    def pan(self, columns: int, rows: int) -> None:
+        """Move view by columns & rows of the screen"""
+
+        center = self.get_center()
+        self.look_at(
+            Position(center.x + columns * self.zoom, center.y + rows * self.zoom)
+        )
+
+    def set_zoom(self, zoom: int) -> None:
+        """Set zoom, clamped to 1...MAX_ZOOM, keeping the center in place"""
+
+        center = self.get_center()
+        self.zoom = max(min(zoom, MAX_ZOOM), 1)
+        self.look_at(center)
+
+    def visible_bounds(self) -> Boundary:
+        """Return the part of the tank shown, non-inclusive like its bounds"""
+
+        startx, starty, endx, endy = self.aquarium.bounds
+
+        return Boundary(
+            Position(max(self.origin.x - 1, startx), max(self.origin.y - 1, starty)),
+            Position(
+                min(self.origin.x + self.columns * self.zoom, endx),
+                min(self.origin.y + self.rows * self.zoom, endy),
+            ),
+        )
+
+    def to_world(self, pos: Position) -> Optional[Position]:
+        """Return world position shown at screen pos, None if outside the view"""
+
+        column, row = pos.x - self.left, pos.y - self.top
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return None
+
+        return Position(
+            self.origin.x + column * self.zoom, self.origin.y + row * self.zoom
+        )
+
+    def to_screen(self, pos: Position) -> Optional[Position]:
+        """Return screen position of world pos, None if it is not shown"""
+
+        column = (pos.x - self.origin.x) // self.zoom
+        row = (pos.y - self.origin.y) // self.zoom
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return None
+
+        return Position(self.left + column, self.top + row)
+
+    def fish_at(self, pos: Position) -> Optional[Fish]:
+        """Return a fish shown at screen pos"""
+
+        world = self.to_world(pos)
+        if world is None:
+            return None
+
+        if self.zoom == 1:
+            return self.aquarium.fish_at(world)
+
+        found = self.aquarium.fish_in(world.x, world.y, self.zoom, self.zoom)
+        return found[0] if len(found) > 0 else None
+
+    def get_area(self, margin: int = 0) -> tuple[int, int, int, int]:
+        """Return (x, y, width, height) of the world shown, grown by margin"""
+
+        return (
+            self.origin.x - margin,
+            self.origin.y - margin,
+            self.columns * self.zoom + 2 * margin,
+            self.rows * self.zoom + 2 * margin,
+        )
+
+    def visible_fish(self) -> list[Fish]:
+        """Return fish intersecting the view"""
+
+        return self.aquarium.fish_in(*self.get_area())
+
+    def project(self, fish: Fish) -> tuple[str, str]:
+        """Return strings that draw & erase fish, empty if it is not shown"""
+
+        if fish.pos is None:
+            return "", ""
+
+        posx, posy = fish.pos
+        row = (posy - self.origin.y) // self.zoom
+        if not 0 <= row < self.rows:
+            return "", ""
+
+        column = (posx - self.origin.x) // self.zoom
+        if self.zoom > 1:
+            if not 0 <= column < self.columns:
+                return "", ""
+
+            cursor = f"\033[{self.top + row};{self.left + column}H"
+            return cursor + fish.get_marker(), cursor + " "
+
+        length = fish.skin_length
+        start = max(-column, 0)
+        end = min(self.columns - column, length)
+        if start >= end:
+            return "", ""
+
+        cursor = f"\033[{self.top + row};{self.left + column + start}H"
+        if start == 0 and end == length:
+            return cursor + repr(fish), cursor + length * " "
+
+        return cursor + fish.get_sprite(start, end), cursor + (end - start) * " "
+
+    def draw(self, fish: Fish) -> str:
+        """Return string that draws fish, if it is shown"""
+
+        return self.project(fish)[0]
+
+    def _food_cursors(self) -> list[str]:
+        """Return cursor movements to every cell of the view holding food"""
+
+        particles = self.aquarium.particles
+        originx, originy, zoom = self.origin.x, self.origin.y, self.zoom
+        columns, rows = self.columns, self.rows
+
+        cells = set()
+        for posx, posy in zip(particles.xs, particles.ys):
+            column = (posx - originx) // zoom
+            row = (posy - originy) // zoom
+            if 0 <= column < columns and 0 <= row < rows:
+                cells.add((row, column))
+
+        return [f"\033[{self.top + row};{self.left + column}H" for row, column in cells]
+
+    def _draw_visible(self) -> tuple[list[str], list[str]]:
+        """Return strings that draw & erase everything visible"""
+
+        drawn = []
+        erased = []
+
+        for fish in self.visible_fish():
+            draw, erase = self.project(fish)
+            if draw:
+                drawn.append(draw)
+                erased.append(erase)
+
+        for cursor in self._food_cursors():
+            drawn.append(cursor + FOOD_SKIN)
+            erased.append(cursor + " ")
+
+        return drawn, erased
+
+    def render(self) -> str:
+        """Return string that erases the last frame & draws the current one
+
+        After invalidate(), the frame is drawn too, covering the whole view."""
+
+        previous = self._erasers
+        drawn, self._erasers = self._draw_visible()
+
+        if self._is_invalid:
+            self._is_invalid = False
+            return repr(self.frame) + "".join(drawn)
+
+        return "".join(previous) + "".join(drawn)
+
+    def keyframe(self) -> str:
+        """Return string that draws the frame & everything inside it"""
+
+        return repr(self.frame) + "".join(self._draw_visible()[0])
@@ -12,15 +12,28 @@ from __future__ import annotations
 # this import should fail according to pylint, but only on macos.
 # pylint: disable=no-name-in-module
 from math import sqrt
-from random import randint
-from typing import Union, Generator, Optional, Any
-
-from pytermgui import gradient, real_length, clean_ansi
-from pytermgui import Container, BaseElement, padding_label
+from time import perf_counter
+from random import randint, random
+from itertools import count
+from collections import Counter
+from typing import (
+    Union,
+    Generator,
+    Optional,
+    Any,
+    Mapping,
+    Iterable,
+    TYPE_CHECKING,
+)
 
-# `dbg` is usually not used in pushed code, but is often called  otherwise.
-# pylint: disable=unused-import
-from . import SPECIES_DATA, dbg
+from . import journal, memory, log
+from .rewind import RewindBuffer
+from .sprites import ATLAS, skin_width, clear_caches
+from .species import Prototype, PigmentPair, pigment_pair, get_registry
+from .occupancy import OccupancyGrid, EMPTY
+from .particles import FoodParticles, SKIN as FOOD_SKIN
+from .timers import Timer, TimerWheel
+from .tracing import TRACER
 from .enums import (
     Event,
     AquariumEvent,
@@ -30,10 +43,39 @@ from .enums import (
     FishProperties,
 )
 
+if TYPE_CHECKING:
+    from .camera import Camera
+
+# length paths are trimmed to while the memory budget is exceeded
+TRIMMED_PATH_LENGTH = 16
+
+# random positions tried by add_many before placing a fish over another
+PLACEMENT_ATTEMPTS = 4
+
+# cells per fish above which Aquarium.fish_in checks fish instead of cells
+FISH_SCAN_RATIO = 64
+
+# distance within which fish notice food being dropped
+FOOD_RANGE = 20
+
+# seconds pellets stay on the bottom of the tank before disappearing
+FOOD_TIMEOUT = 10
+
+# ticks a fish waits between two bites of food
+EAT_COOLDOWN = 4
+
+# memory.estimate() entries that grow with every fish
+FISH_ACCOUNTING = ["Fish", "Position", "Boundary", "path entries"]
+
+# fish the camera can't see move once per this many ticks
+LOD_INTERVAL = 8
+
 
 class Position:
     """Class for easier & more legible positions"""
 
+    __slots__ = ("x", "y")
+
     # having variables named x and y makes most sense
     # pylint: disable=invalid-name
     def __init__(self, x: int = 0, y: int = 0, xy: Optional[list[int]] = None):
@@ -111,6 +153,8 @@ class Position:
 class Boundary:
     """Boundary made up by two Position objects, non-inclusive of borders"""
 
+    __slots__ = ("start", "end")
+
     def __init__(self, pos1: Position, pos2: Position) -> None:
         """Initialize object"""
 
@@ -212,72 +256,114 @@ class Fish:
 
     """
 
+    __slots__ = (
+        "parent",
+        "prototype",
+        "uid",
+        "age",
+        "path",
+        "bounds",
+        "skin",
+        "skin_length",
+        "_pos",
+        "_skins",
+        "_pigments",
+        "_follow_target",
+        "_heading",
+        "_can_bite",
+    )
+
+    heading_left = -1
+    heading_right = 1
+
     # it makes sense for this class to have as many attributes as it does.
-    # pylint: disable=too-many-instance-attributes
-    def __init__(self, parent: Aquarium, properties: FishProperties):
-        """Set up instance"""
+    # pylint: disable=too-many-instance-attributes, too-many-arguments
+    def __init__(
+        self,
+        parent: Aquarium,
+        prototype: Union[Prototype, Mapping[str, Any]],
+        pos: Optional[Position] = None,
+        age: Optional[int] = None,
+        pigment: Optional[list[int]] = None,
+    ):
+        """Set up instance
 
+        prototype holds the properties shared with other fish, a mapping is
+        turned into one with Prototype.from_properties()."""
+
+        if not isinstance(prototype, Prototype):
+            prototype = Prototype.from_properties(prototype)
+
+        self.parent = parent
+        self.prototype = prototype
+        self.uid: Optional[int] = None
+        self.age = age if age is not None else prototype.age
         self.path: list[tuple[Position, int]] = []
-        self.pigment: list[int] = []
-        self.forced_pigment: Optional[list[int]] = None
-        self.skin_length: int = 0
-        self.stages: list[str]
         self.bounds: Optional[Boundary] = None
-        self.name: str = ""
         self.skin: str = ""
-        self.variant: str
-        self.species: str
-        self.age: int
+        self.skin_length: int = 0
 
         self._pos: Optional[Position] = None
         self._skins: tuple[str, str]
         self._follow_target: Optional[Union[Fish, Food]] = None
-        self._food: Optional[Food] = None
         self._heading: int = 0
+        self._can_bite = True
 
-        self.parent = parent
-        self._set_properties(properties)
-        self.pigment = self.get_pigment()
-
-        self.heading_left = -1
-        self.heading_right = 1
+        self._pigments: PigmentPair = (
+            pigment_pair(tuple(pigment)) if pigment is not None else self.get_pigment()
+        )
 
         # trigger event to set skins
         self.notify(FishEvent.AGE_CHANGED, self)
-        self.update()
+        self.pos = pos if pos is not None else Position(0, 0)
 
-    def _set_properties(self, properties: FishProperties) -> None:
-        for key, value in properties.items():
-            if key == "pos":
-                # this is a no-case, but mypy complains
-                if not isinstance(value, list):
-                    raise NotImplementedError()
+    @property
+    def species(self) -> str:
+        """Return name of species"""
 
-                if not all(isinstance(v, int) for v in value):
-                    raise NotImplementedError()
+        return self.prototype.species
 
-                posx, posy = value
-                value = Position(posx, posy)
+    @property
+    def variant(self) -> Optional[str]:
+        """Return variant, None for specials & species defaults"""
 
-            setattr(self, key, value)
+        return self.prototype.variant
 
-    @staticmethod
-    def _reverse_skin(skin: str) -> str:
-        """Return char by char reversed version of skin"""
+    @property
+    def name(self) -> str:
+        """Return name, empty for everything but specials"""
 
-        reversed_skin = ""
-        reversible = ["<>", "[]", "{}", "()", "/\\", "db", "qp"]
-        for char in reversed(skin):
-            for rev in reversible:
-                if char in rev:
-                    new = rev[rev.index(char) - 1]
-                    break
-            else:
-                new = char
+        return self.prototype.name
+
+    @property
+    def type(self) -> FishType:
+        """Return FishType"""
+
+        return self.prototype.type
+
+    @property
+    def stages(self) -> tuple[str, ...]:
+        """Return skins of every age"""
+
+        return self.prototype.stages
 
-            reversed_skin += new
+    @property
+    def speed(self) -> Optional[int]:
+        """Return speed"""
 
-        return reversed_skin
+        return self.prototype.speed
+
+    @property
+    def pigment(self) -> tuple[int, ...]:
+        """Return colors of the skin's characters"""
+
+        return self._pigments[0]
+
+    @pigment.setter
+    def pigment(self, value: Union[list[int], tuple[int, ...]]) -> None:
+        """Set colors of the skin's characters"""
+
+        self._pigments = pigment_pair(tuple(value))
 
     @property
     def pos(self) -> Optional[Position]:
@@ -287,16 +373,34 @@ class Fish:
 
     @pos.setter
     def pos(self, value: Position) -> None:
-        """Set new position and update bounds"""
+        """Set new position and update bounds & occupied cells"""
+
+        bounds = self.bounds
+        width = skin_width(self.skin)
+        start, end = Position(value.x, value.y), Position(value.x + width, value.y)
 
         self._pos = value
-        start, end = self._get_bounds()
+        if bounds is None:
+            self.bounds = Boundary(start, end)
 
-        if self.bounds is not None:
-            self.bounds.update(start, end)
+            if self.uid is not None:
+                self.parent.grid.place(self.uid, value.x, value.y, width)
 
-        else:
-            self.bounds = Boundary(start, end)
+            return
+
+        if self.uid is not None:
+            self.parent.grid.move(self.uid, self.get_cells(), (value.x, value.y, width))
+
+        bounds.update(start, end)
+
+    def get_cells(self) -> tuple[int, int, int]:
+        """Return (x, y, width) of the row of cells covered by the fish"""
+
+        if self.bounds is None:
+            raise TypeError("self.bounds cannot be None during get_cells.")
+
+        start, end = self.bounds.start, self.bounds.end
+        return start.x, start.y, end.x - start.x
 
     def _get_bounds(self, pos: Optional[Position] = None) -> tuple[Position, Position]:
         """Return boundaries of object"""
@@ -307,9 +411,8 @@ class Fish:
         if pos is None:
             pos = self.pos
 
-        posx, posy = pos
-        start = Position(posx, posy)
-        end = Position(posx + real_length(self.skin), posy)
+        start = Position(pos.x, pos.y)
+        end = Position(pos.x + skin_width(self.skin), pos.y)
 
         return start, end
 
@@ -324,14 +427,23 @@ class Fish:
 
         # skins are right-headed
         if self._heading is self.heading_left:
-            skin = self._skins[1]
-            pigment = list(reversed(self.pigment))
+            return ATLAS.get(self._skins[1], self._pigments[1])
 
-        else:
-            skin = self._skins[0]
-            pigment = self.pigment
+        return ATLAS.get(self._skins[0], self._pigments[0])
+
+    def get_sprite(self, start: int, end: int) -> str:
+        """Return the columns start:end of repr(self), pigmented on their own"""
+
+        index = 1 if self._heading is self.heading_left else 0
+        return ATLAS.get(self._skins[index][start:end], self._pigments[index])
 
-        return gradient(skin, pigment)
+    def get_marker(self) -> str:
+        """Return a pigmented arrow pointing where self is heading"""
+
+        if self._heading is self.heading_left:
+            return ATLAS.get("<", self._pigments[1])
+
+        return ATLAS.get(">", self._pigments[0])
 
     def _position_valid(self, pos: Position) -> bool:
         """Return validity (is within self.parent.bounds) of pos
@@ -343,7 +455,7 @@ class Fish:
 
         posx, posy = pos
         start_pos = Position(posx, posy)
-        end_pos = Position(posx + real_length(self.skin), posy)
+        end_pos = Position(posx + skin_width(self.skin), posy)
 
         start_error = self.parent.bounds.error(start_pos)
         end_error = self.parent.bounds.error(end_pos)
@@ -354,30 +466,10 @@ class Fish:
 
         return False
 
-    def get_pigment(self) -> list[int]:
-        """Get pigmentation using self.variant"""
-
-        if self.forced_pigment is not None:
-            return self.forced_pigment
-
-        if (available := self.pigment) is not None:
-            if available == []:
-                return []
-
-            pigment = []
-            length = max(len(clean_ansi(l)) for l in self.stages)
+    def get_pigment(self) -> PigmentPair:
+        """Get random (pigment, reversed pigment) from the prototype's pool"""
 
-            for _ in range(length):
-                if len(available) > 1:
-                    index = randint(0, len(available) - 1)
-                else:
-                    index = 0
-
-                pigment.append(available[index])
-
-            return pigment
-
-        return self.pigment
+        return self.prototype.random_pigment()
 
     def get_path(self, pos: Position) -> list[tuple[Position, int]]:
         """Get position to pos, return it as a list of Position-s"""
@@ -404,8 +496,9 @@ class Fish:
         # error
         error = diffx + diffy
 
-        path = []
-        while True:
+        path: list[tuple[Position, int]] = []
+        limit = self.parent.max_path_length
+        while len(path) != limit:
             pos = Position(startx, starty)
             if not self._position_valid(pos):
                 break
@@ -426,6 +519,87 @@ class Fish:
 
         return path
 
+    def _is_blocked(self, pos: Position) -> bool:
+        """Return if moving to pos would make fish overlap another
+
+        Fish that already overlap another are never blocked, so that they
+        can get away from it."""
+
+        if not self.parent.avoid_overlap or self.uid is None:
+            return False
+
+        grid = self.parent.grid
+        cells = self.get_cells()
+        if grid.is_free(self.uid, pos.x, pos.y, cells[2]):
+            return False
+
+        return grid.is_free(self.uid, *cells)
+
+    def _get_dodge(self, pos: Position) -> Optional[Position]:
+        """Return a free position above or below pos, if there is one"""
+
+        if self.uid is None:
+            return None
+
+        _, starty, _, endy = self.parent.bounds
+        offsets = [-1, 1] if randint(0, 1) else [1, -1]
+        width = self.get_cells()[2]
+
+        for offset in offsets:
+            posy = pos.y + offset
+            if starty < posy < endy and self.parent.grid.is_free(
+                self.uid, pos.x, posy, width
+            ):
+                return Position(pos.x, posy)
+
+        return None
+
+    def coarse_update(self, steps: int) -> Optional[Position]:
+        """Move up to steps cells at once, without planning a path
+
+        This is used for fish nobody is looking at. A path planned earlier
+        is followed by skipping entries, afterwards the fish swims straight
+        at the tank's target. Fish chasing food are given up to steps usual
+        updates instead, so they get to it as fast as they would on screen,
+        but only take a bite once per call."""
+
+        if self.pos is None:
+            return self.update()
+
+        if self._follow_target is not None:
+            pos: Optional[Position] = self.pos
+            for _ in range(steps):
+                previous, pos = pos, self.update()
+
+                # eating, waiting to take the next bite or blocked
+                if self._follow_target is None or pos == previous:
+                    break
+
+            return pos
+
+        if len(self.path) > steps:
+            del self.path[: steps - 1]
+            self.pos, self._heading = self.path.pop(0)
+            return self.pos
+
+        # both the target & pos are valid, so is everything between them
+        self.path = []
+        target = self.parent.get_next_position(self)
+        posx, posy = self.pos
+        offsetx = max(min(target.x - posx, steps), -steps)
+        offsety = max(min(target.y - posy, steps), -steps)
+
+        if offsetx == 0 and offsety == 0:
+            self.parent.notify(AquariumEvent.TARGET_REACHED, self)
+            self.parent.record(journal.TARGET, self, None)
+            return self.pos
+
+        if offsetx != 0:
+            self._heading = self.heading_right if offsetx > 0 else self.heading_left
+
+        self.pos = Position(posx + offsetx, posy + offsety)
+        return self.pos
+
     def get_new_path(self) -> list[tuple[Position, int]]:
         """Get new target according to self.type
         Note: this should handle different FishTypes
@@ -474,24 +648,41 @@ class Fish:
         distance = self.distance_to(food)
 
         if distance <= target_distance and self.pos.y == food.pos.y:
+            # wait next to the food until the cooldown of the last bite ends
+            if not self._can_bite:
+                return True
+
             food.health -= 1
+            self._can_bite = False
+            self.parent.timers.schedule(EAT_COOLDOWN, self._end_cooldown)
 
-            if randint(0, 10) == 1 and self.age < len(self.stages) - 1:
+            if randint(0, 10) == 1 and self.age < len(self.prototype.stages) - 1:
                 self.age += 1
                 self.notify(FishEvent.AGE_CHANGED, self)
+                self.parent.record(journal.AGE, self, self.age)
 
             return True
 
         return False
 
+    def _end_cooldown(self) -> None:
+        """Allow taking the next bite"""
+
+        self._can_bite = True
+
     def update(self) -> Optional[Position]:
         """Do next position update"""
 
-        if self._follow_target is not None:
-            if self._follow_target.pos is None:
-                raise TypeError("self._follow_target.pos cannot be None during update")
+        target = self._follow_target.pos if self._follow_target is not None else None
 
-            self.path = self.get_path(self._follow_target.pos)
+        # the target was removed without notifying, e.g. by rewinding
+        if target is None:
+            self._follow_target = None
+
+        else:
+            start = TRACER.begin()
+            self.path = self.get_path(target)
+            TRACER.end("path planning", start)
 
         if self.consume_food():
             return self.pos
@@ -503,19 +694,27 @@ class Fish:
             if self._follow_target is not None:
                 self.path.pop(0)
 
+            pos, heading = self.path[0]
+            if pos is not self._pos and self._is_blocked(pos):
+                dodge = self._get_dodge(pos)
+
+                # wait for the way to clear, sometimes squeezing past to
+                # avoid waiting on eachother forever
+                if dodge is None and randint(0, 31) > 0:
+                    return self.pos
+
+                if dodge is not None:
+                    self.path[0] = dodge, heading
+
             self.pos, self._heading = self.path.pop(0)
 
         else:
             self.parent.notify(AquariumEvent.TARGET_REACHED, self)
 
-            candidates = []
-            for food in self.parent.foods():
-                candidates.append((food, self.distance_to(food)))
-
-            if len(candidates) > 0:
-                candidates.sort(key=lambda value: value[1])
-                food, _ = candidates[0]
+            food = self.parent.nearest_food(self.pos) if self.pos is not None else None
+            if food is not None:
                 self._follow_target = food
+                self.parent.record(journal.TARGET, self, food.uid)
 
             else:
                 path = []
@@ -528,7 +727,10 @@ class Fish:
 
                         path += [(self.pos, heading)]
 
+                start = TRACER.begin()
                 self.path = path + self.get_new_path()
+                TRACER.end("path planning", start)
+                self.parent.record(journal.TARGET, self, None)
 
         return self.pos
 
@@ -536,7 +738,7 @@ class Fish:
         """Notify fish of some event"""
 
         if event == AquariumEvent.FOOD_DESTROYED:
-            if data is not self._follow_target:
+            if data != self._follow_target:
                 return
 
             self._follow_target = None
@@ -548,35 +750,67 @@ class Fish:
             if not isinstance(data, Food):
                 raise Exception(f"Object {data} is not Food! How did this happen?")
 
-            if self.distance_to(data) < 20:
+            if self.distance_to(data) < FOOD_RANGE:
                 self._follow_target = data
+                self.parent.record(journal.TARGET, self, data.uid)
 
         elif event == FishEvent.AGE_CHANGED:
-            _skin = self.stages[self.age]
-            self._skins = _skin, self._reverse_skin(_skin)
+            self._skins = self.prototype.skins[self.age]
             self.skin = self._skins[0]
             self.skin_length = len(self.skin)
 
-    def wipe(self) -> None:
-        """Wipe fish's skin at its current position"""
+            # update bounds & occupied cells to the new width
+            if self._pos is not None:
+                self.pos = self._pos
+
+    def dump(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation of self"""
+
+        return {
+            "kind": "fish",
+            "uid": self.uid,
+            "name": self.name,
+            "species": self.species,
+            "variant": self.variant,
+            "type": self.type.name,
+            "stages": list(self.stages),
+            "speed": self.speed,
+            "age": self.age,
+            "pigment": list(self.pigment),
+            "pos": list(self.pos) if self.pos is not None else None,
+            "heading": self._heading,
+        }
+
+    def erase(self) -> str:
+        """Return string that wipes fish's skin at its current position"""
 
         if self.pos is None:
-            return
+            return ""
 
         posx, posy = self.pos
-        print(f"\033[{posy};{posx}H" + real_length(self.skin) * " ")
+        return f"\033[{posy};{posx}H" + skin_width(self.skin) * " "
 
-    def show(self) -> None:
-        """Show repr(self) at self.pos"""
+    def draw(self) -> str:
+        """Return string that shows repr(self) at self.pos"""
 
         if self.pos is None:
-            return
+            return ""
 
         posx, posy = self.pos
-        print(f"\033[{posy};{posx}H" + repr(self))
+        return f"\033[{posy};{posx}H" + repr(self)
+
+    def wipe(self) -> None:
+        """Wipe fish's skin at its current position"""
+
+        print(self.erase())
+
+    def show(self) -> None:
+        """Show repr(self) at self.pos"""
+
+        print(self.draw())
 
-    def say(self, message: str) -> None:
-        """ Show message in a speechbubble """
+    def say(self, message: str, pos: Optional[Position] = None) -> None:
+        """ Show message in a speechbubble, next to pos if given """
 
         bubble = []
         bubble.append(" ." + len(message) * "-" + ". ")
@@ -584,11 +818,14 @@ class Fish:
         bubble.append(" `" + len(message) * "-" + "` ")
         bubble.append(" /")
 
-        if not self.pos:
-            dbg(self.name + ": Cannot say() without a set pos!")
+        if pos is None:
+            pos = self.pos
+
+        if not pos:
+            log.warning("%s: cannot say() without a set pos!", self.name)
             return
 
-        posx, posy = self.pos
+        posx, posy = pos
         posy -= 4
         if self._heading is self.heading_right:
             posx += self.skin_length - 1
@@ -598,185 +835,303 @@ class Fish:
 
 
 class Food:
-    """fud"""
-
-    # it makes sense for this class to have this many attributes.
-    # pylint: disable=too-many-instance-attributes
-    def __init__(
-        self, parent: Aquarium, health: int = 5, pos: Optional[Position] = None
-    ):
-        """Initialize object"""
+    """fud
 
-        self.bounds = Boundary(Position(0, 0), Position(0, 0))
-        self.health: int = health
-        self.skin: str = "#"
-        self.path: list[Position] = []
-        self.counter: int = 0
-        self._is_stopped: bool = False
-        self._idle_framecount: int = 0
+    A handle to one pellet of the parent's particles, which is where its
+    state is kept. Handles of the same pellet are equal, and their position
+    is None once the pellet is destroyed."""
 
-        if pos is None:
-            self._pos = Position()
-        else:
-            self._pos = pos
-
-        self.parent = parent
-
-    @property
-    def pos(self) -> Optional[Position]:
-        """Get self._pos"""
-
-        return self._pos
-
-    @pos.setter
-    def pos(self, value: Position) -> None:
-        """Set self._pos"""
-
-        self._pos = value
-
-        if self.pos is not None:
-            self.bounds.update(self.pos, self.pos + Position(x=real_length(self.skin)))
-
-    def stop(self) -> None:
-        """Stop updates of object"""
-
-        self._is_stopped = True
+    __slots__ = ("parent", "uid")
 
-    def destroy(self) -> None:
-        """Remove self from parent"""
+    skin = FOOD_SKIN
 
-        self.parent.notify(AquariumEvent.FOOD_DESTROYED, self)
-        self.wipe()
+    def __init__(self, parent: Aquarium, uid: int) -> None:
+        """Initialize object"""
 
-    def update(self) -> None:
-        """Update position & path"""
+        self.parent = parent
+        self.uid = uid
 
-        # destroy at 0 health of when the object has been idle for 10 seconds
-        if self.health <= 0 or self._idle_framecount >= self.parent.fps * 10:
-            self.destroy()
+    def __eq__(self, other: object) -> bool:
+        """Return if other is a handle of the same pellet"""
 
-        if self._is_stopped:
-            self._idle_framecount += 1
-            return
+        return isinstance(other, Food) and other.uid == self.uid
 
-        # only update on every second frame
-        self.counter += 1
-        if self.counter < 3:
-            return
+    def __hash__(self) -> int:
+        """Return hash of the pellet's uid"""
 
-        self.counter = 0
+        return hash(self.uid)
 
-        x_change = randint(-1, 1)
+    @property
+    def pos(self) -> Optional[Position]:
+        """Get position, None if the pellet was destroyed"""
 
-        if self.pos is None:
-            raise TypeError("self.pos cannot be None during update.")
+        particles = self.parent.particles
+        slot = particles.find(self.uid)
+        if slot is None:
+            return None
 
-        target_pos = self.pos + Position(x_change, 1)
-        error = self.parent.bounds.error(target_pos)
+        return Position(particles.xs[slot], particles.ys[slot])
 
-        # only move down if x is out of bounds
-        if error is BoundaryError.X:
-            self.pos += Position(0, 1)
-            return
+    @pos.setter
+    def pos(self, value: Position) -> None:
+        """Set position"""
 
-        # stop moving if y is out of bounds
-        if error is BoundaryError.XY or error is BoundaryError.Y:
-            self.stop()
-            return
+        self.parent.particles.move(self.uid, value.x, value.y)
 
-        # add target otherwise
-        self.pos = target_pos
+    @property
+    def health(self) -> int:
+        """Get health, 0 if the pellet was destroyed"""
 
-    def wipe(self) -> None:
-        """Clear char at pos"""
+        particles = self.parent.particles
+        slot = particles.find(self.uid)
+        return particles.health[slot] if slot is not None else 0
 
-        if self.pos is None:
-            return
+    @health.setter
+    def health(self, value: int) -> None:
+        """Set health, the pellet is destroyed on the next update at 0"""
 
-        posx, posy = self.pos
-        print(f"\033[{posy};{posx}H" + real_length(self.skin) * " ")
+        particles = self.parent.particles
+        slot = particles.find(self.uid)
+        if slot is not None:
+            particles.health[slot] = value
+            self.parent.sync_despawn(self.uid)
 
-    def show(self) -> None:
-        """Print self to pos"""
+    def dump(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation of self"""
 
-        if self.pos is None:
-            return
+        return self.parent.particles.dump(self.uid, self.parent.get_idle(self.uid))
 
-        posx, posy = self.pos
-        print(f"\033[{posy};{posx}H" + self.skin)
 
+class Aquarium:
+    """An object to store & update fish
 
-# as long as pytermgui is not typed this error would occur.
-class Aquarium(Container):  # type: ignore[misc]
-    """An object to store & update fish"""
+    This is only the simulation, it never draws anything: see fishtank.view
+    for the frame around it & drawing its objects. The position & size are
+    those of that frame, fish live in self.bounds within it."""
 
-    # pylint: disable=invalid-name
     def __init__(
         self,
         pos: Optional[list[int]] = None,
-        _width: int = 70,
-        _height: int = 25,
+        width: int = 70,
+        height: int = 25,
     ):
         """Set up object"""
 
-        super().__init__(width=_width, height=_height)
+        self.pos = Position(xy=pos) if pos is not None else Position(0, 0)
+        self.width = width
+        self.height = height
 
+        # ticks per second
         self.fps: int
-        self.objects: list[Union[Fish, Food]] = []
+        self.objects: list[Fish] = []
+        self.particles = FoodParticles()
+        self.timers = TimerWheel()
         self.target_pos: Union[Position, None] = None
         self.bounds: Boundary
+        self.ticks: int = 0
+        self.journal: Optional[journal.Journal] = None
+        self.rewind: Optional[RewindBuffer] = None
+        self.sim_time: float = 0.0
+        self.event_counts: Counter[str] = Counter()
+        self.fanout_counts: Counter[str] = Counter()
+        self.memory_budget: Optional[int] = None
+        self.memory_used: int = 0
+
+        # bytes per fish & pellet found by the last check_memory(), added to
+        # memory_used by every spawn until the next one
+        self._fish_bytes: int = 0
+        self._pellet_bytes: int = 0
+        self._measured_count: int = 0
+        self._memory_checked_at: Optional[int] = None
+        self.max_path_length: Optional[int] = None
+
+        # max_path_length while within the memory budget, None for no limit
+        self.path_limit: Optional[int] = None
+        self.refused_spawns: int = 0
+        self.avoid_overlap: bool = True
+
+        # fish the camera can't see are given coarse updates, once per
+        # lod_interval ticks; 1 updates every fish every tick
+        self.lod_interval: int = LOD_INTERVAL
+        self.detailed_fish: Optional[int] = None
+
+        # when set, fish far from the part of the tank camera shows are
+        # updated less often
+        self.camera: Optional[Camera] = None
 
         self._is_paused: bool = False
         self._prev_target_pos: Optional[Position] = None
+        self._uids = count(1)
+        self._fish_by_uid: dict[int, Fish] = {}
 
-        if pos is None:
-            pos = [0, 0]
-
-        x, y = pos
-        self.pos = Position(x, y)
+        # fish split in lod_interval buckets, one of which is given coarse
+        # updates every tick; fish are added to them in turn
+        self._lod_buckets: list[dict[int, Fish]] = []
+        self._lod_added = 0
 
-        for i, c in enumerate("..''"):
-            self.set_corner(i, c)
+        # despawn timers of pellets, and uids of the ones whose timer fired
+        self._despawns: dict[int, Timer] = {}
+        self._expired: list[int] = []
 
-        for _ in range(self.height):
-            self += padding_label
-
-        repr(self)
-        self.center()
         self.bounds = self._get_bounds()
+        self.grid = OccupancyGrid(self.bounds)
 
     def __iter__(self) -> Generator[Union[Fish, Food], None, None]:
-        """Iterate through fish children"""
+        """Iterate through fish, then foods"""
 
-        for obj in self.objects:
-            yield obj
+        yield from self.objects
+        yield from self.foods()
 
-    def __add__(self, other: Union[BaseElement, Fish]) -> Aquarium:
-        """Add BaseElement or Fish to contents"""
+    def __add__(self, other: Fish) -> Aquarium:
+        """Add Fish to contents"""
+
+        if not self._fits_budget(fish=1):
+            self.refused_spawns += 1
+            log.warning("memory budget exceeded, not adding %s", type(other).__name__)
 
-        if issubclass(type(other), BaseElement):
-            self._add_element(other)
         else:
+            self.memory_used += self._fish_bytes
             self.objects.append(other)
 
-            while not self.contains(other):
+            if not self.contains(other):
                 other.pos = self._get_position_in_bounds(other)
             other.path = []
 
             other.parent = self
+            other.uid = next(self._uids)
+            if self.journal is not None:
+                self.record(journal.SPAWN, other, other.dump())
+
+            self._track(other)
 
-            if isinstance(other, Food):
-                for fish in self.fish():
-                    fish.notify(AquariumEvent.FOOD_AVAILABLE, other)
             self.pause(False)
 
         return self
 
-    def __iadd__(self, other: Union[BaseElement, Fish]) -> Aquarium:
+    def __iadd__(self, other: Fish) -> Aquarium:
         """Execute __add__, return self"""
 
         return self.__add__(other)
 
+    def add_many(
+        self, prototypes: Iterable[Union[Prototype, Mapping[str, Any]]]
+    ) -> list[Fish]:
+        """Create & add a fish for each of prototypes, return them
+
+        Unlike adding one by one, the memory budget is only checked once and
+        positions are drawn directly from the free area of each skin width,
+        avoiding other fish within PLACEMENT_ATTEMPTS tries. Paths start out
+        empty, and are planned by each fish's first update."""
+
+        prototypes = list(prototypes)
+        if not self._fits_budget(fish=len(prototypes)):
+            self.refused_spawns += len(prototypes)
+            log.warning("memory budget exceeded, not adding %s fish", len(prototypes))
+            return []
+
+        startx, starty, endx, endy = self.bounds
+        miny, height = starty + 1, max(endy - starty - 1, 1)
+        uids = self._uids
+        grid = self.grid
+        is_recorded = self.journal is not None
+
+        added = []
+        for prototype in prototypes:
+            if not isinstance(prototype, Prototype):
+                prototype = Prototype.from_properties(prototype)
+
+            width = skin_width(prototype.skins[prototype.age][0])
+            for _ in range(PLACEMENT_ATTEMPTS):
+                posx = startx + 1 + int(random() * max(endx - startx - width - 1, 1))
+                posy = miny + int(random() * height)
+
+                if grid.is_free(EMPTY, posx, posy, width):
+                    break
+
+            fish = Fish(self, prototype, pos=Position(posx, posy))
+            fish.uid = next(uids)
+            grid.place(fish.uid, posx, posy, width)
+            self._fish_by_uid[fish.uid] = fish
+            self._add_to_bucket(fish.uid, fish)
+            added.append(fish)
+
+            if is_recorded:
+                self.record(journal.SPAWN, fish, fish.dump())
+
+        self.objects.extend(added)
+        self.memory_used += len(added) * self._fish_bytes
+        self.pause(False)
+
+        return added
+
+    def add_food(self, pos: Optional[Position] = None) -> Optional[Food]:
+        """Drop a pellet at pos, or somewhere random, return it
+
+        None is returned when the memory budget doesn't allow it."""
+
+        area = (pos.x, pos.y, 1, 1) if pos is not None else None
+        if self.add_food_burst(1, area) == 0:
+            return None
+
+        return Food(self, self.particles.uids[-1])
+
+    # pylint: disable=too-many-locals
+    def add_food_burst(
+        self, amount: int, area: Optional[tuple[int, int, int, int]] = None
+    ) -> int:
+        """Scatter amount pellets over an (x, y, width, height) area, return amount
+
+        Without an area, pellets are scattered over the whole tank. Fish
+        close to the area are notified once, and go for the pellet nearest
+        to them."""
+
+        if not self._fits_budget(pellets=amount):
+            self.refused_spawns += amount
+            log.warning("memory budget exceeded, not adding %s pellets", amount)
+            return 0
+
+        self.memory_used += amount * self._pellet_bytes
+
+        if area is None:
+            startx, starty, endx, endy = self.bounds
+            area = startx + 1, starty + 1, endx - startx - 2, endy - starty - 1
+
+        posx, posy, width, height = area
+        is_recorded = self.journal is not None
+
+        for _ in range(amount):
+            uid = next(self._uids)
+            self.particles.add(
+                uid, posx + int(random() * width), posy + int(random() * height)
+            )
+
+            if is_recorded:
+                food = Food(self, uid)
+                self.record(journal.SPAWN, food, food.dump())
+
+        self.event_counts[AquariumEvent.FOOD_AVAILABLE.name] += 1
+
+        delivered = 0
+        for fish in self.fish():
+            if fish.pos is None:
+                continue
+
+            fishx, fishy = fish.pos
+            offsetx = max(posx - fishx, fishx - posx - width + 1, 0)
+            offsety = max(posy - fishy, fishy - posy - height + 1, 0)
+            if offsetx * offsetx + offsety * offsety >= FOOD_RANGE * FOOD_RANGE:
+                continue
+
+            nearest = self.nearest_food(fish.pos)
+            if nearest is not None:
+                fish.notify(AquariumEvent.FOOD_AVAILABLE, nearest)
+                delivered += 1
+
+        self.fanout_counts[AquariumEvent.FOOD_AVAILABLE.name] += delivered
+        self.pause(False)
+
+        return amount
+
     def _get_bounds(self) -> Boundary:
         """Return boundaries of object"""
 
@@ -786,45 +1141,131 @@ class Aquarium(Container):  # type: ignore[misc]
 
         return Boundary(start, end)
 
-    def _get_position_in_bounds(self, obj: Optional[Fish] = None) -> Position:
-        """Return a Position() object that is guaranteed to be within bounds"""
+    def _get_position_in_bounds(
+        self, obj: Optional[Union[Fish, Food]] = None
+    ) -> Position:
+        """Return a random Position() where obj is within bounds
+
+        If obj is wider than the tank, it is placed at the left edge."""
 
         startx, starty, endx, endy = self.bounds
+        width = skin_width(obj.skin) if obj is not None else 0
+
+        return Position(
+            randint(startx + 1, max(endx - width - 1, startx + 1)),
+            randint(starty + 1, endy - 1),
+        )
+
+    def _track(self, fish: Fish) -> None:
+        """Start tracking the cells covered by fish"""
+
+        if fish.uid is None:
+            raise TypeError("fish.uid cannot be None while tracking it.")
+
+        self._fish_by_uid[fish.uid] = fish
+        self._add_to_bucket(fish.uid, fish)
+        self.grid.place(fish.uid, *fish.get_cells())
+
+    def _add_to_bucket(self, uid: int, fish: Fish) -> None:
+        """Add tracked fish to the next LOD bucket"""
+
+        buckets = self._lod_buckets
+        if len(buckets) == 0:
+            return
+
+        buckets[self._lod_added % len(buckets)][uid] = fish
+        self._lod_added += 1
+
+    def _fill_buckets(self, interval: int) -> None:
+        """Split every tracked fish in interval LOD buckets"""
 
-        if obj is not None:
-            startx += real_length(obj.skin) - 1
-            endx -= real_length(obj.skin) + 1
+        self._lod_buckets = [{} for _ in range(interval)]
+        self._lod_added = 0
+        for uid, fish in self._fish_by_uid.items():
+            self._add_to_bucket(uid, fish)
 
-        return Position(randint(startx + 1, endx - 1), randint(starty + 1, endy - 1))
+    def remove(self, obj: Union[Fish, Food]) -> None:
+        """Remove obj from the tank"""
+
+        if isinstance(obj, Food):
+            self.particles.remove(obj.uid)
+            self.sync_despawn(obj.uid)
+            return
+
+        self.objects.remove(obj)
+
+        if obj.uid is not None:
+            self._fish_by_uid.pop(obj.uid, None)
+            self.grid.remove(obj.uid, *obj.get_cells())
+
+            for bucket in self._lod_buckets:
+                bucket.pop(obj.uid, None)
+
+    def clear(self) -> None:
+        """Remove every object from the tank"""
+
+        self.objects = []
+        self._fish_by_uid = {}
+        self._lod_buckets = []
+        self.grid.reset(self.bounds)
+        self.particles.clear()
+        self.timers.clear()
+        self._despawns = {}
+        self._expired = []
+
+    def find(self, uid: int) -> Optional[Union[Fish, Food]]:
+        """Return the fish or food with uid, None if there is none"""
+
+        if uid in self.particles:
+            return Food(self, uid)
+
+        return self._fish_by_uid.get(uid)
 
     def foods(self) -> Generator[Food, None, None]:
         """Iterate through foods"""
 
-        for obj in self.objects:
-            if isinstance(obj, Food):
-                yield obj
+        for uid in list(self.particles.uids):
+            yield Food(self, uid)
+
+    def nearest_food(self, pos: Position) -> Optional[Food]:
+        """Return the food closest to pos, None if there is none"""
+
+        uid = self.particles.nearest(pos.x, pos.y)
+        return Food(self, uid) if uid is not None else None
 
     def fish(self) -> Generator[Fish, None, None]:
         """Iterate through fish"""
 
-        for obj in self.objects:
-            if isinstance(obj, Fish):
-                yield obj
+        yield from self.objects
 
     def notify(self, event: AquariumEvent, data: Optional[Any] = None) -> None:
         """Notify Aquarium of events"""
 
+        start = TRACER.begin()
+        self.event_counts[event.name] += 1
+        self._dispatch(event, data)
+        TRACER.end("event dispatch", start)
+
+    def _broadcast(self, event: AquariumEvent, data: Any) -> None:
+        """Notify every fish of event, counting deliveries"""
+
+        delivered = 0
+        for fish in self.fish():
+            fish.notify(event, data)
+            delivered += 1
+
+        self.fanout_counts[event.name] += delivered
+
+    def _dispatch(self, event: AquariumEvent, data: Optional[Any] = None) -> None:
+        """Handle event given to notify()"""
+
         if event is AquariumEvent.FOOD_DESTROYED:
             # NOTE: this should never be raised, but even then
             #       should be limited by an option
             if not isinstance(data, Food):
                 raise Exception(f"Object {data} is not food! How did this happen?")
 
-            if data in self.objects:
-                self.objects.remove(data)
-
-            for f in self.fish():
-                f.notify(event, data)
+            self._destroy_food([data.uid])
 
         elif event is AquariumEvent.TARGET_REACHED:
             if not isinstance(data, Fish):
@@ -833,27 +1274,302 @@ class Aquarium(Container):  # type: ignore[misc]
             self._prev_target_pos = self.target_pos
             self.target_pos = None
 
+    # pylint: disable=protected-access
+    def _destroy_food(self, uids: list[int]) -> None:
+        """Remove pellets, then notify the fish that were following them
+
+        Only fish following one of the pellets can be affected, so they are
+        found with a single pass over the fish instead of notifying all of
+        them once per pellet."""
+
+        destroyed = set()
+        for uid in uids:
+            food = Food(self, uid)
+            if uid in self.particles:
+                self.record(journal.DESTROY, food)
+                self.particles.remove(uid)
+                self.sync_despawn(uid)
+                destroyed.add(food)
+
+        delivered = 0
+        for fish in self.fish():
+            if fish._follow_target in destroyed:
+                fish.notify(AquariumEvent.FOOD_DESTROYED, fish._follow_target)
+                delivered += 1
+
+        self.fanout_counts[AquariumEvent.FOOD_DESTROYED.name] += delivered
+
+    def _expire(self, uid: int) -> None:
+        """Mark pellet uid to be destroyed by the current update"""
+
+        self._despawns.pop(uid, None)
+        self._expired.append(uid)
+
+    def sync_despawn(self, uid: int, idle: int = 0) -> None:
+        """Schedule or cancel the despawn timer of pellet uid to match its state
+
+        Eaten pellets are destroyed on the next tick, and pellets on the
+        bottom once they were idle for FOOD_TIMEOUT seconds. A timer is only
+        ever moved closer."""
+
+        timer = self._despawns.get(uid)
+        delay: Optional[int] = None
+
+        slot = self.particles.find(uid)
+        if slot is not None and self.particles.health[slot] <= 0:
+            delay = 1
+
+        elif slot is not None and self.particles.is_stopped(uid):
+            delay = self.fps * FOOD_TIMEOUT - idle
+
+        if timer is not None:
+            if delay is not None and self.timers.remaining(timer) <= delay:
+                return
+
+            timer.cancel()
+            del self._despawns[uid]
+
+        if delay is not None:
+            self._despawns[uid] = self.timers.schedule(delay, self._expire, uid)
+
+    def get_idle(self, uid: int) -> int:
+        """Return ticks pellet uid has been idle on the bottom for"""
+
+        timer = self._despawns.get(uid)
+        if timer is None:
+            return 0
+
+        return max(self.fps * FOOD_TIMEOUT - self.timers.remaining(timer), 0)
+
+    def record(self, kind: str, obj: Union[Fish, Food], *data: Any) -> None:
+        """Record an event about obj in self.journal, if there is one"""
+
+        if self.journal is None or obj.uid is None:
+            return
+
+        pos = list(obj.pos) if obj.pos is not None else None
+        self.journal.record(self.ticks, kind, obj.uid, pos, *data)
+
+    def dump(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation of the tank's state"""
+
+        return {
+            "ticks": self.ticks,
+            "target_pos": list(self.target_pos) if self.target_pos else None,
+            "objects": [obj.dump() for obj in self],
+        }
+
+    def load(self, state: dict[str, Any]) -> None:
+        """Replace current state with one returned by dump()"""
+
+        self.clear()
+        self.ticks = state["ticks"]
+
+        if (target := state["target_pos"]) is not None:
+            self.target_pos = Position(xy=target)
+
+        max_uid = 0
+        for data in state["objects"]:
+            self.load_object(data)
+            max_uid = max(max_uid, data["uid"])
+
+        self._uids = count(max_uid + 1)
+
+    # pylint: disable=protected-access
+    def load_object(self, data: dict[str, Any]) -> Union[Fish, Food]:
+        """Create & insert object from its dump(), keeping its uid and position"""
+
+        if data["kind"] == "food":
+            self.particles.load(data)
+            self.sync_despawn(data["uid"], data["idle_framecount"])
+            return Food(self, data["uid"])
+
+        properties: FishProperties = {
+            key: data[key]
+            for key in ["name", "species", "stages", "type", "variant", "speed"]
+        }
+
+        obj = Fish(
+            self,
+            get_registry().find(properties) or properties,
+            pos=Position(xy=data["pos"]),
+            age=data["age"],
+            pigment=data["pigment"],
+        )
+        obj._heading = data["heading"]
+        obj.path = []
+
+        obj.uid = data["uid"]
+        self.objects.append(obj)
+        self._track(obj)
+
+        return obj
+
+    # pylint: disable=protected-access
+    def set_state(self, obj: Union[Fish, Food], state: tuple[int, ...]) -> None:
+        """Set position, heading & age of obj from a rewind.get_state() tuple
+
+        Foods have neither, they are set from a FoodParticles.states() tuple."""
+
+        if isinstance(obj, Food):
+            self.particles.set_state(obj.uid, state)
+            self.sync_despawn(obj.uid)
+            return
+
+        posx, posy, heading, age = state
+        obj.pos = Position(posx, posy)
+
+        obj._heading = heading
+        obj.path = []
+
+        if obj.age != age:
+            obj.age = age
+            obj.notify(FishEvent.AGE_CHANGED, obj)
+
+    # pylint: disable=protected-access
+    def apply_record(self, kind: str, uid: int, data: list[Any]) -> None:
+        """Apply a journal record to the current state"""
+
+        if kind == journal.SPAWN:
+            _, obj_data = data
+            self.load_object(obj_data)
+            self._uids = count(max(uid + 1, next(self._uids)))
+            return
+
+        obj = self.find(uid)
+        if obj is None:
+            log.warning("journal record %s references unknown object %s", kind, uid)
+            return
+
+        pos, *rest = data
+        if pos is not None:
+            obj.pos = Position(xy=pos)
+
+        if kind == journal.DESTROY:
+            self.remove(obj)
+            for fish in self.fish():
+                if fish._follow_target == obj:
+                    fish._follow_target = None
+
+        elif not isinstance(obj, Fish):
+            return
+
+        elif kind == journal.AGE:
+            obj.age = rest[0]
+            obj.notify(FishEvent.AGE_CHANGED, obj)
+
+        elif kind == journal.TARGET:
+            target_uid = rest[0]
+            obj._follow_target = (
+                Food(self, target_uid) if target_uid in self.particles else None
+            )
+            obj.path = []
+
+    def check_memory(self) -> bool:
+        """Return if the tank is within its memory budget, compacting if needed
+
+        Paths stay trimmed until usage drops below half of the budget."""
+
+        if self.memory_budget is None:
+            return True
+
+        self._measure_memory()
+        if self.memory_used <= self.memory_budget:
+            if self.memory_used < self.memory_budget // 2:
+                self.max_path_length = self.path_limit
+
+            return True
+
+        self.compact()
+        self._measure_memory()
+
+        return self.memory_used <= self.memory_budget
+
+    def _measure_memory(self) -> None:
+        """Set memory_used & the sizes of a fish and a pellet from an estimate"""
+
+        report = memory.estimate(self)
+        self.memory_used = memory.total(report)
+        self._memory_checked_at = self.ticks
+        self._measured_count = len(self.objects) + len(self.particles)
+
+        fish_count = report["Fish"]["count"]
+        if fish_count > 0:
+            self._fish_bytes = (
+                sum(report[name]["bytes"] for name in FISH_ACCOUNTING) // fish_count
+            )
+
+        food = report["Food"]
+        if food["count"] > 0:
+            self._pellet_bytes = food["bytes"] // food["count"]
+
+    def _fits_budget(self, fish: int = 0, pellets: int = 0) -> bool:
+        """Return if adding fish & pellets keeps the tank within its budget
+
+        The estimate is only redone by check_memory() once the tank would
+        have doubled since the last one, or the sizes it found say they
+        wouldn't fit, at most once per tick. Adding one by one then doesn't
+        measure the whole tank every time."""
+
+        if self.memory_budget is None:
+            return True
+
+        total = len(self.objects) + len(self.particles) + fish + pellets
+        if total > 2 * self._measured_count:
+            return self.check_memory()
+
+        added = fish * self._fish_bytes + pellets * self._pellet_bytes
+        if self.memory_used + added <= self.memory_budget:
+            return True
+
+        if self._memory_checked_at == self.ticks:
+            return False
+
+        return self.check_memory()
+
+    def compact(self) -> None:
+        """Empty sprite caches & trim paths of every object"""
+
+        clear_caches()
+        self.max_path_length = TRIMMED_PATH_LENGTH
+
+        for obj in self.objects:
+            del obj.path[TRIMMED_PATH_LENGTH:]
+
     def pause(self, value: bool = True) -> None:
         """Pause updates"""
 
         self._is_paused = value
 
     def fish_at(self, pos: Position) -> Optional[Fish]:
-        """Return the thing that is at the position given"""
+        """Return the fish that is at the position given"""
 
-        px, py = pos
-        for e in self.objects:
-            if not isinstance(e, Fish):
-                continue
+        return self._fish_by_uid.get(self.grid.at(pos.x, pos.y))
 
-            if e.bounds is None:
-                continue
+    def fish_in(self, posx: int, posy: int, width: int, height: int) -> list[Fish]:
+        """Return fish covering any cell of a width x height area, by uid
 
-            startx, starty, endx, endy = e.bounds
-            if starty <= py <= endy and startx <= px <= endx:
-                return e
+        Every fish with a cell in the area is returned, including ones that
+        are entirely covered by others."""
 
-        return None
+        # scanning an area much larger than the population is slower than
+        # checking every fish
+        if width * height > FISH_SCAN_RATIO * len(self._fish_by_uid):
+            endx, endy = posx + width, posy + height
+
+            found = []
+            for _, fish in sorted(self._fish_by_uid.items()):
+                fishx, fishy, fish_width = fish.get_cells()
+                if posy <= fishy < endy and posx - fish_width < fishx < endx:
+                    found.append(fish)
+
+            return found
+
+        fish_by_uid = self._fish_by_uid
+        return [
+            fish_by_uid[uid]
+            for uid in sorted(self.grid.uids_in(posx, posy, width, height))
+        ]
 
     def contains(self, obj: Fish) -> bool:
         """Return if obj is contained within self"""
@@ -863,13 +1579,18 @@ class Aquarium(Container):  # type: ignore[misc]
 
         return self.bounds.contains(obj.bounds)
 
-    def move(self, pos: list[int], _wipe: bool = False) -> Aquarium:
-        """Implement move method using Position-s"""
+    def resize(self, width: int, height: int) -> Aquarium:
+        """Set new size & update bounds
+
+        Views show the size the tank had when they were created."""
 
-        self.pos = Position(xy=pos)
-        if _wipe:
-            self.wipe()
-        self.get_border()
+        self.width = width
+        self.height = height
+        self.bounds = self._get_bounds()
+
+        self.grid.reset(self.bounds)
+        for uid, fish in self._fish_by_uid.items():
+            self.grid.place(uid, *fish.get_cells())
 
         return self
 
@@ -887,21 +1608,78 @@ class Aquarium(Container):  # type: ignore[misc]
 
         return self.target_pos
 
-    def update(self) -> None:
-        """Update elements in self.objects"""
+    def _update_fish(self) -> None:
+        """Update fish, giving the ones far from the camera coarse updates
 
-        def show_element(element: Union[Food, Fish]) -> None:
-            """Show element"""
+        Fish within the margin of the view are updated every tick. The rest
+        is split in lod_interval buckets, one of which moves lod_interval
+        steps at once every tick. The margin is wide enough that fish are
+        updated every tick before they can reach the view.
 
-            element.wipe()
-            element.update()
-            element.show()
+        Buckets are kept up to date as fish are added & removed, and are
+        only rebuilt when lod_interval changes."""
+
+        interval = self.lod_interval
+        if self.camera is None or interval <= 1:
+            self.detailed_fish = None
+            for fish in self.fish():
+                fish.update()
 
-        if self._is_paused:
             return
 
-        for food in self.foods():
-            show_element(food)
+        if len(self._lod_buckets) != interval:
+            self._fill_buckets(interval)
 
-        for fish in self.fish():
-            show_element(fish)
+        detailed = self.fish_in(*self.camera.get_area(margin=2 * interval))
+        self.detailed_fish = len(detailed)
+        for fish in detailed:
+            fish.update()
+
+        detailed_uids = {fish.uid for fish in detailed}
+        group = list(self._lod_buckets[self.ticks % interval].values())
+        for fish in group:
+            if fish.uid not in detailed_uids:
+                fish.coarse_update(interval)
+
+    def update(self) -> bool:
+        """Update food & fish by a tick, return False if paused
+
+        Nothing is drawn, views draw the tank after updating it. Time spent
+        updating is stored in sim_time."""
+
+        if self._is_paused:
+            return False
+
+        self.ticks += 1
+        sim_start = perf_counter()
+
+        start = TRACER.begin()
+        self.timers.advance()
+        TRACER.end("timers", start)
+
+        start = TRACER.begin()
+        if len(self._expired) > 0:
+            expired, self._expired = self._expired, []
+            self.event_counts[AquariumEvent.FOOD_DESTROYED.name] += len(expired)
+            self._destroy_food(expired)
+
+        for uid in self.particles.step(self.bounds):
+            self.sync_despawn(uid)
+        TRACER.end("food update", start)
+
+        start = TRACER.begin()
+        self._update_fish()
+        TRACER.end("fish update", start)
+
+        self.sim_time = perf_counter() - sim_start
+
+        if self.journal is not None and self.journal.checkpoint_due(self.ticks):
+            self.journal.checkpoint(self.dump())
+
+        if self.rewind is not None:
+            self.rewind.capture(self)
+
+        if self.memory_budget is not None and self.ticks % self.fps == 0:
+            self.check_memory()
+
+        return True
@@ -0,0 +1,196 @@
+"""
+fishtank.hud
+------------
+author: bczsalba
+
+
+This module provides a performance overlay drawn next to (or, when there is
+no room, inside) the Aquarium's border.
+
+It shows the current fps, a sparkline & histogram of frame times, p99 of the
+window, object counts, bytes written per frame, the split between
+simulation and rendering time and the estimated memory of the tank.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
+from pytermgui import Container
+from pytermgui.utils import width
+
+from . import memory
+from .stats import FrameStats
+
+if TYPE_CHECKING:
+    from .classes import Aquarium
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# upper bounds of histogram buckets, in seconds
+HISTOGRAM_BUCKETS = [0.002, 0.004, 0.008, 0.016, 0.033, float("inf")]
+
+WIDTH = 28
+SPARKLINE_LENGTH = 24
+
+# memory is estimated once per this many frames
+MEMORY_INTERVAL = 45
+
+
+def sparkline(values: list[float], length: int = SPARKLINE_LENGTH) -> str:
+    """Return sparkline of the last length values, scaled to their maximum"""
+
+    values = values[-length:]
+    if len(values) == 0:
+        return ""
+
+    maximum = max(values) or 1.0
+    last = len(SPARK_CHARS) - 1
+
+    return "".join(SPARK_CHARS[int(value / maximum * last)] for value in values)
+
+
+def histogram(values: list[float]) -> list[tuple[float, int]]:
+    """Return count of values for each HISTOGRAM_BUCKETS upper bound"""
+
+    counts = [0] * len(HISTOGRAM_BUCKETS)
+    for value in values:
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if value <= bound:
+                counts[i] += 1
+                break
+
+    return list(zip(HISTOGRAM_BUCKETS, counts))
+
+
+class Hud:
+    """Toggleable performance overlay"""
+
+    def __init__(
+        self, aquarium: Aquarium, stats: FrameStats, view: Optional[Container] = None
+    ) -> None:
+        """Set up object, placing it next to view (the aquarium by default)"""
+
+        self.aquarium = aquarium
+        self.stats = stats
+        self.view = view if view is not None else aquarium
+        self.is_visible = False
+
+        self._drawn_lines = 0
+        self._memory_report: dict[str, dict[str, int]] = {}
+        self._frames_since_memory = MEMORY_INTERVAL
+
+    def toggle(self) -> str:
+        """Toggle visibility, return string that clears the overlay if hidden"""
+
+        self.is_visible = not self.is_visible
+
+        if self.is_visible:
+            return ""
+
+        return self.erase()
+
+    def _origin(self) -> tuple[int, int]:
+        """Return top-left position of the overlay"""
+
+        posx, posy = self.view.pos
+        outside = posx + self.view.width + 3
+
+        if outside + WIDTH < width():
+            return outside, posy + 1
+
+        return posx + 2, posy + 2
+
+    def _memory_lines(self) -> list[str]:
+        """Return lines of the (periodically refreshed) memory report"""
+
+        self._frames_since_memory += 1
+        if self._frames_since_memory >= MEMORY_INTERVAL:
+            self._memory_report = memory.estimate(self.aquarium)
+            self._frames_since_memory = 0
+
+        report = self._memory_report
+        largest = max(report, key=lambda name: report[name]["bytes"])
+        budget = self.aquarium.memory_budget
+
+        lines = [
+            f"mem    {memory.total(report) / 1024:6.0f}KiB"
+            + (f" /{budget // 1024}" if budget is not None else ""),
+            f"top    {largest[:10]:<10} {report[largest]['bytes'] / 1024:.0f}KiB",
+        ]
+
+        if self.aquarium.refused_spawns:
+            lines.append(f"refused {self.aquarium.refused_spawns:5} spawns")
+
+        return lines
+
+    def _detail_lines(self) -> list[str]:
+        """Return line with the count of fully updated fish, if it is limited
+
+        The rest of the fish move once per lod_interval ticks."""
+
+        aquarium = self.aquarium
+        if aquarium.detailed_fish is None:
+            return []
+
+        return [f"detail {aquarium.detailed_fish:6}  rest 1/{aquarium.lod_interval}"]
+
+    def get_lines(self) -> list[str]:
+        """Return the lines of the overlay"""
+
+        stats = self.stats
+        frame_times = list(stats.frame_times)
+        aquarium = self.aquarium
+
+        fish = list(aquarium.fish())
+        foods = len(aquarium.particles)
+        paths = sum(1 for f in fish if len(f.path) > 0)
+
+        sim = sum(stats.sim_times)
+        render = sum(stats.render_times)
+        total = (sim + render) or 1.0
+
+        frame_bytes = stats.frame_bytes[-1] if len(stats.frame_bytes) else 0
+
+        lines = [
+            f"fps    {stats.fps:6.1f}",
+            f"p99    {stats.percentile(0.99) * 1000:6.2f}ms",
+            sparkline(frame_times),
+            f"fish   {len(fish):6}  food {foods:5}",
+            f"paths  {paths:6}",
+            *self._detail_lines(),
+            f"bytes  {frame_bytes:6}/frame",
+            f"sim    {sim / total:6.0%}  render {render / total:4.0%}",
+            *self._memory_lines(),
+        ]
+
+        buckets = histogram(frame_times)
+        maximum = max(count for _, count in buckets) or 1
+        for bound, count in buckets:
+            label = f"<{bound * 1000:.0f}ms" if bound != float("inf") else ">33ms"
+            lines.append(f"{label:>6} {'█' * (count * 12 // maximum):<12} {count}")
+
+        return lines
+
+    def render(self) -> str:
+        """Return string that draws the overlay, empty if hidden"""
+
+        if not self.is_visible:
+            return ""
+
+        posx, posy = self._origin()
+        lines = self.get_lines()
+        self._drawn_lines = len(lines)
+
+        return "".join(
+            f"\033[{posy + i};{posx}H" + line.ljust(WIDTH)[:WIDTH]
+            for i, line in enumerate(lines)
+        )
+
+    def erase(self) -> str:
+        """Return string that wipes the last drawn overlay"""
+
+        posx, posy = self._origin()
+        return "".join(
+            f"\033[{posy + i};{posx}H" + WIDTH * " " for i in range(self._drawn_lines)
+        )
@@ -0,0 +1,109 @@
+"""
+fishtank.inspector
+------------------
+author: bczsalba
+
+
+This module provides the line below the tank describing a fish.
+
+The inspector is driven by the mouse: hovering or clicking a fish shows its
+name & stats. Fish are found with Camera.fish_at, and the line is only
+redrawn when the fish under the cursor changes, so moving the mouse over a
+crowded tank costs a grid lookup per event and nothing else. The shown fish
+keeps moving, so refresh() is called every frame to redraw the line when
+its description changes, and to clear it once the fish leaves the tank.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
+from pytermgui.utils import width
+
+if TYPE_CHECKING:
+    from .camera import Camera
+    from .classes import Fish, Position
+
+
+def describe(fish: Fish) -> str:
+    """Return a one-line summary of fish"""
+
+    # pylint: disable=protected-access
+    state = "chasing food" if fish._follow_target is not None else "idle"
+    title = f"{fish.name} the {fish.species}" if fish.name else fish.species
+    kind = fish.type.name.lower().replace("_", " ")
+    posx, posy, _ = fish.get_cells()
+
+    return (
+        f"{title} ({fish.variant}, {kind})"
+        + f" | age {fish.age + 1}/{len(fish.stages)}"
+        + f" | speed {fish.speed} | at {posx},{posy} | {state}"
+    )
+
+
+class Inspector:
+    """Line describing the fish under the mouse"""
+
+    def __init__(self, camera: Camera) -> None:
+        """Set up object"""
+
+        self.camera = camera
+        self.fish: Optional[Fish] = None
+
+        self._drawn_length = 0
+        self._line = ""
+
+    def _origin(self) -> tuple[int, int]:
+        """Return position of the line, right below the view"""
+
+        posx, posy = self.camera.frame.pos
+        return posx, posy + self.camera.frame.height + 1
+
+    def hover(self, pos: Position) -> str:
+        """Return string that shows the fish at pos, empty if it is unchanged"""
+
+        fish = self.camera.fish_at(pos)
+        if fish is self.fish:
+            return ""
+
+        return self.show(fish)
+
+    def refresh(self) -> str:
+        """Return string that redraws the line if it changed, empty otherwise"""
+
+        fish = self.fish
+        if fish is None:
+            return ""
+
+        if fish.uid is None or self.camera.aquarium.find(fish.uid) is not fish:
+            return self.show(None)
+
+        if describe(fish) == self._line:
+            return ""
+
+        return self.show(fish)
+
+    def show(self, fish: Optional[Fish]) -> str:
+        """Return string that describes fish, or clears the line if None"""
+
+        self.fish = fish
+        if fish is None:
+            return self.erase()
+
+        posx, posy = self._origin()
+        self._line = describe(fish)
+        line = self._line[: max(width() - posx, 0)]
+
+        padding = max(self._drawn_length - len(line), 0)
+        self._drawn_length = len(line)
+
+        return f"\033[{posy};{posx}H" + line + padding * " "
+
+    def erase(self) -> str:
+        """Return string that wipes the last drawn line"""
+
+        posx, posy = self._origin()
+        length, self._drawn_length = self._drawn_length, 0
+        self._line = ""
+
+        return f"\033[{posy};{posx}H" + length * " "
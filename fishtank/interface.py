@@ -10,11 +10,9 @@ The interface to the interactive fishtank to your terminal.
 
 from __future__ import annotations
 
-# why does pylint hate sqrt?
-# pylint: disable=no-name-in-module
-from math import sqrt
-from typing import Type, Optional
+from typing import Type, Optional, Callable, Any, TYPE_CHECKING
 from threading import Thread
+from collections import deque
 from random import randint
 from time import sleep, time
 
@@ -38,22 +36,33 @@ from pytermgui.utils import (
     height,
 )
 
-from .classes import Fish, Aquarium, Position, Food
-from . import SPECIES_DATA, to_local, styles
+from .classes import Fish, Aquarium, Position
+from .journal import Journal, can_restore, restore, rotate
+from .recorder import Recorder
+from .rewind import RewindBuffer
+from .stats import summarize, FrameStats
+from .hud import Hud
+from .camera import Camera
+from .inspector import Inspector
+from .tracing import TRACER
+from .species import get_registry
+from . import to_local, styles, log, mouse
 
-try:
-    # these arent always used, but are handy to have imported.
-    # pylint: disable=unused-import
-    from .fishfile import Molly, Guppy, Corydoras
-    from .fishfile import random as random_from
+from .enums import FishProperties
 
-except ImportError:
-    # this module may not be available, but the program will
-    # crash when that's the case and the fish_generator isn't
-    # called to fix it.
-    pass
+if TYPE_CHECKING:
+    from .metrics import MetricsExporter
 
-from .enums import FishProperties, FishType
+# screen columns & rows the view moves by, in quarters of its size
+PAN_KEYS = {
+    "ARROW_LEFT": (-1, 0),
+    "ARROW_RIGHT": (1, 0),
+    "ARROW_UP": (0, -1),
+    "ARROW_DOWN": (0, 1),
+}
+
+# pellets scattered by a feed burst
+FOOD_BURST = 5000
 
 
 class Menu:
@@ -82,7 +91,7 @@ class NewfishDialog(Menu):
         """Create objects & variables"""
 
         return
-        self.types = list(SPECIES_DATA.keys())
+        self.types = get_registry().names()
         self.age_names = ["fry", "juvenile", "adult"]
 
         self.menu = load_from_file(to_local("layouts/newfish.ptg"))
@@ -113,7 +122,7 @@ class NewfishDialog(Menu):
         self.current_index = 0
         self.fish_key = self.types[self.current_index]
 
-        self.variants.value = list(SPECIES_DATA[self.fish_key]["variants"])[0]
+        self.variants.value = get_registry()[self.fish_key].variants[0]
         self.age.value = self.age_names[1]
 
         self.skin.set_style("value", self.get_skin)
@@ -176,12 +185,12 @@ class NewfishDialog(Menu):
 
         return
         self.menu.wipe()
-        data = SPECIES_DATA[self.fish_key]
+        species = get_registry()[self.fish_key]
 
         data = {
             "name": self.fish_key,
-            "speed": str(data["speed"]),
-            "variants": str(len(data["variants"])),
+            "speed": str(species.get().speed),
+            "variants": str(len(species.variants)),
         }
 
         page = load_from_file(to_local("layouts/info_page.ptg"))
@@ -206,13 +215,13 @@ class NewfishDialog(Menu):
         return
         cont = Container(width=40)
         cont.static_width = 40
-        variants = SPECIES_DATA[self.fish_key]["variants"]
+        variants = get_registry()[self.fish_key].variants
         cont += Label(f"Choose {self.fish_key} variant")
         cont += padding_label
 
         inner = Container()
         inner.static_width = 34
-        for var in variants.keys():
+        for var in variants:
             inner += Prompt(options=[var])
 
         cont += inner
@@ -290,56 +299,88 @@ class NewfishDialog(Menu):
             self.fish_key = self.types[self.current_index]
 
             if _fish_change:
-                self.variants.value = list(SPECIES_DATA[self.fish_key]["variants"])[0]
+                self.variants.value = get_registry()[self.fish_key].variants[0]
                 self.update_fish()
 
             print(self.menu)
 
 
 class FeedingMenu(Menu):
-    """Menu for feeding stuff"""
+    """Menu for feeding stuff
+
+    The tank is paused, but left on screen: only the cursor and the cell it
+    leaves are redrawn after each key."""
 
     def setup(self) -> None:
         """Set up values"""
 
-        self.pos = Position()
+        camera = self.interface.camera
 
-    def select(self) -> None:
-        """Show selection menu"""
+        self.pos = Position(
+            camera.left + camera.columns // 2, camera.top + camera.rows // 2
+        )
+        self.is_confirmed = False
 
-        key = ""
+    def _restore(self, pos: Position) -> str:
+        """Return string that redraws what the cursor covered at pos"""
 
-        right_pos = Position(1, 0)
-        left_pos = Position(-1, 0)
-        up_pos = Position(0, 1)
-        down_pos = Position(0, -1)
+        fish = self.interface.camera.fish_at(pos)
+        if fish is not None:
+            return self.interface.camera.draw(fish)
 
-        for obj in self.interface.aquarium:
-            obj.show()
+        return f"\033[{pos.y};{pos.x}H "
 
-        while key not in ["ESC", "SIGTERM"]:
-            key = getch()
+    def _is_in_tank(self, pos: Position) -> bool:
+        """Return if screen pos shows a cell food can be dropped into"""
 
-            self.pos.wipe()
-            if key in keys.prev:
-                self.pos += up_pos
+        world = self.interface.camera.to_world(pos)
+        return world is not None and self.interface.aquarium.bounds.contains(world)
 
-            elif key in keys.next:
-                self.pos += down_pos
+    def _move_cursor(self, new: Position) -> None:
+        """Move cursor to new if it is in the tank"""
 
-            elif key in keys.back:
-                self.pos += left_pos
+        if not self._is_in_tank(new):
+            return
 
-            elif key in keys.fore:
-                self.pos += right_pos
+        old, self.pos = self.pos, new
+        print(self._restore(old) + f"\033[{new.y};{new.x}Hx", end="", flush=True)
 
-            elif key == "ENTER":
+    def select(self) -> None:
+        """Move cursor until a position is chosen or ESC is pressed"""
+
+        moves = [
+            (keys.prev, Position(0, -1)),
+            (keys.next, Position(0, 1)),
+            (keys.back, Position(-1, 0)),
+            (keys.fore, Position(1, 0)),
+        ]
+
+        print(f"\033[{self.pos.y};{self.pos.x}Hx", end="", flush=True)
+
+        while True:
+            key = getch()
+
+            if key in ["ESC", "SIGTERM"]:
                 break
 
-            for obj in self.interface.aquarium:
-                obj.show()
+            if key == "ENTER":
+                self.is_confirmed = True
+                break
+
+            if mouse.is_mouse(key):
+                clicks = [event for event in mouse.parse(key) if event.is_click()]
+                if clicks and self._is_in_tank(clicks[0].pos):
+                    self._move_cursor(clicks[0].pos)
+                    self.is_confirmed = True
+                    break
+
+                continue
+
+            for move_keys, offset in moves:
+                if key in move_keys:
+                    self._move_cursor(self.pos + offset)
 
-            self.pos.show()
+        print(self._restore(self.pos), end="", flush=True)
 
     def choose_size(self) -> None:
         """not sure bout this one"""
@@ -347,11 +388,11 @@ class FeedingMenu(Menu):
     def finish(self) -> None:
         """Finalize & add"""
 
-        aquarium = self.interface.aquarium
-        food = Food(aquarium, pos=self.pos)
-        food.pos = self.pos
+        world = self.interface.camera.to_world(self.pos)
+        if not self.is_confirmed or world is None:
+            return
 
-        aquarium += food
+        self.interface.drop_food(world)
 
     def run(self) -> None:
         """Run menu"""
@@ -364,32 +405,132 @@ class FeedingMenu(Menu):
 class InterfaceManager:
     """ Manager class for all interface related operations """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        journal_path: Optional[str] = None,
+        record_path: Optional[str] = None,
+        rewind_seconds: Optional[int] = None,
+        metrics_path: Optional[str] = None,
+        metrics_socket: Optional[str] = None,
+        memory_budget: Optional[int] = None,
+        world_scale: int = 1,
+    ) -> None:
         styles.default()
 
-        self.aquarium: Aquarium = Aquarium(_width=width() // 2, _height=height() - 15)
-        self.aquarium.fps = 25
-        self.aquarium.center()
+        # world coordinates start where the tank would be centered on screen
+        tank_width, tank_height = width() // 2, height() - 15
+        self.aquarium: Aquarium = Aquarium(
+            pos=[(width() - tank_width) // 2, (height() - tank_height) // 2],
+            width=tank_width,
+            height=tank_height,
+        )
+        self.display_fps = 45
+
+        # the tank is updated once per frame shown
+        self.aquarium.fps = self.display_fps
+        self.aquarium.memory_budget = memory_budget
+
+        # the view keeps the size of the tank as it fits on screen
+        view_width, view_height = self.aquarium.width, self.aquarium.height
+        self.world_scale = world_scale
+
+        if world_scale > 1:
+            self.aquarium.resize(
+                self.aquarium.width * world_scale, self.aquarium.height * world_scale
+            )
+
+            # schools crossing the world would plan thousands of steps at once
+            self.aquarium.path_limit = view_width
+            self.aquarium.max_path_length = view_width
+
+        self.camera = Camera(self.aquarium, view_width, view_height)
+        self.aquarium.camera = self.camera
+        self.journal_path = journal_path
+
+        self.frame_stats = FrameStats(self.display_fps * 3)
+        self.hud = Hud(self.aquarium, self.frame_stats, view=self.camera.frame)
+        self.inspector = Inspector(self.camera)
+
+        # written by the display thread, so it never interleaves with frames
+        self._overlay_output: deque[str] = deque()
+
+        # run by the display thread, so the tank never changes during an update
+        self._pending: deque[Callable[[], Any]] = deque()
+
+        self.recorder: Optional[Recorder] = None
+        if record_path is not None:
+            self.recorder = Recorder(record_path, fps=self.display_fps)
+
+        if rewind_seconds is not None:
+            self.aquarium.rewind = RewindBuffer(rewind_seconds * self.display_fps)
+
+        self.metrics: Optional[MetricsExporter] = None
+        if metrics_path is not None or metrics_socket is not None:
+            # http.server is slow to import, and rarely needed
+            # pylint: disable=import-outside-toplevel
+            from .metrics import MetricsExporter
+
+            self.metrics = MetricsExporter(
+                self.aquarium, self.frame_stats, frame_budget=1 / self.display_fps
+            )
+            self.metrics.start(path=metrics_path, socket_path=metrics_socket)
+
+        # called once, after the first frame was drawn
+        self.on_first_frame: Optional[Callable[[], None]] = None
 
         self._loop = True
         self._display_loop = Thread(target=self.display_loop, name="display_loop")
 
     def _do_update(self) -> float:
+        while self._pending:
+            self._pending.popleft()()
+
+        trace_start = TRACER.begin()
         start = time()
-        self.aquarium.update()
+        self.camera.update()
+
+        if self.recorder is not None:
+            self.recorder.add_frame(self.camera.last_frame, self.camera.get_keyframe)
 
         duration = time() - start
-        sleep(max([1 / 45 - duration, 0.0]))
+        TRACER.end("_do_update", trace_start)
+
+        # frames are pure ASCII, so their length is their size in bytes
+        self.frame_stats.add(
+            start,
+            duration,
+            self.aquarium.sim_time,
+            self.camera.render_time,
+            len(self.camera.last_frame),
+        )
+
+        if self.metrics is not None:
+            self.metrics.observe(duration)
+
+        if self.hud.is_visible:
+            print(self.hud.render(), end="", flush=True)
+
+        self._overlay_output.append(self.inspector.refresh())
+        while self._overlay_output:
+            print(self._overlay_output.popleft(), end="", flush=True)
+
+        trace_start = TRACER.begin()
+        sleep(max([1 / self.display_fps - duration, 0.0]))
+        TRACER.end("sleep", trace_start)
 
         return duration
 
     def display_loop(self) -> None:
         """ Main display loop """
 
-        print(self.aquarium)
+        self.camera.invalidate()
         while self._loop:
             self._do_update()
 
+            if self.on_first_frame is not None:
+                self.on_first_frame()
+                self.on_first_frame = None
+
     def benchmark(self, num: Optional[int] = None) -> None:
         """ Run benchmark on how long Aquarium() updates take """
 
@@ -405,17 +546,19 @@ class InterfaceManager:
             print("\033[0H\033[K" + f"{i}/{num}")
 
         wipe()
-        mean = sum(durations) / len(durations)
-        minimum = min(durations)
-        maximum = max(durations)
+        summary = summarize(durations)
+        minimum = summary["min"]
+        maximum = summary["max"]
         maximum_non_0 = max(durations[1:])
-        std = sqrt(sum([(dur - mean) ** 2 for dur in durations]))
 
-        print("mean:", round(mean, 5))
+        print("mean:", round(summary["mean"], 5))
         print("minimum @:", minimum, durations.index(minimum))
         print("maximum @:", maximum, durations.index(maximum))
         print("maximum_non_0 @:", maximum_non_0, durations.index(maximum_non_0))
-        print("standard deviation:", round(std, 5))
+        print(
+            "p50/p95/p99:", *(round(summary[key], 5) for key in ["p50", "p95", "p99"])
+        )
+        print("standard deviation:", round(summary["std"], 5))
 
         hide_cursor(0)
 
@@ -427,108 +570,250 @@ class InterfaceManager:
 
             if key == "SIGTERM":
                 self._loop = False
+                self._display_loop.join()
+                self.close_journal()
+
+                if self.recorder is not None:
+                    self.recorder.close()
+
+                if self.metrics is not None:
+                    self.metrics.stop()
+
+                print(mouse.DISABLE, end="", flush=True)
                 hide_cursor(False)
                 wipe()
                 break
 
-            if key == "+":
+            if mouse.is_mouse(key):
+                self.handle_mouse(key)
+
+            elif key == "+":
                 self.show(NewfishDialog)
 
             elif key == " ":
                 self.aquarium.pause()
-                getch()
+                self.wait_for_key()
                 self.aquarium.pause(False)
 
+            elif key == "p":
+                self._overlay_output.append(self.hud.toggle())
+
+            elif key in ["[", "]"]:
+                self.step_rewind(backwards=key == "[")
+
             elif key == "f":
-                self.aquarium += Food(self.aquarium)
-                # currently unused
-                # self.show(FeedingMenu)
+                startx, starty, endx, endy = self.camera.visible_bounds()
+                posx = randint(startx + 1, endx - 1)
+                posy = randint(starty + 1, endy - 1)
+                self.drop_food(Position(posx, posy))
+
+            elif key == "b":
+                self.drop_food_burst()
+
+            elif key in PAN_KEYS:
+                columns, rows = PAN_KEYS[key]
+                self.camera.pan(
+                    columns * self.camera.columns // 4, rows * self.camera.rows // 4
+                )
+
+            elif key in ["-", "="]:
+                self.camera.set_zoom(
+                    self.camera.zoom * 2 if key == "-" else self.camera.zoom // 2
+                )
+
+            elif key == "F":
+                self.aquarium.pause()
+                FeedingMenu(self)
+                self.aquarium.pause(False)
 
             elif key == "*":
-                # self.aquarium += Fish(self.aquarium, random_from(Molly))
+                # self.aquarium += Fish(self.aquarium, get_registry().random("Molly"))
 
-                printer = None
                 self.aquarium.pause()
-                for fish in self.aquarium.fish():
-                    if printer is None:
-                        printer = fish
+
+                # the first fish shown from its start speaks, the rest is hidden
+                speaker = None
+                for fish in self.camera.visible_fish():
+                    posx, posy, _ = fish.get_cells()
+                    screen_pos = self.camera.to_screen(Position(posx, posy))
+
+                    if speaker is None and screen_pos is not None:
+                        speaker = fish, screen_pos
                         continue
 
-                    fish.wipe()
+                    print(self.camera.project(fish)[1], end="")
 
-                if printer is not None:
-                    printer.say("my name is " + printer.name + "!")
+                if speaker is not None:
+                    fish, screen_pos = speaker
+                    fish.say("my name is " + fish.name + "!", pos=screen_pos)
 
-                getch()
+                self.wait_for_key()
                 wipe()
 
-                print(self.aquarium)
+                self.camera.invalidate()
                 self.aquarium.pause(False)
 
             elif key == "CTRL_R":
-                self.aquarium.objects = []
+                # the display thread can't be updating the tank while it is cleared
                 self._loop = False
                 self._display_loop.join()
-                self._display_loop = Thread(target=self.display_loop)
+                self.aquarium.clear()
+                self._display_loop = Thread(
+                    target=self.display_loop, name="display_loop"
+                )
                 self._loop = True
                 self.start()
 
             elif key == "CTRL_L":
                 wipe()
-                print(self.aquarium)
+                self.camera.invalidate()
+
+    def wait_for_key(self) -> str:
+        """ Return the next key pressed, ignoring mouse events """
+
+        while mouse.is_mouse(key := getch()):
+            pass
+
+        return key
+
+    def handle_mouse(self, key: str) -> None:
+        """ Drop food on clicks in the tank, inspect fish hovered or clicked """
+
+        for event in mouse.parse(key):
+            if event.is_click():
+                fish = self.camera.fish_at(event.pos)
+                world = self.camera.to_world(event.pos)
+
+                if fish is not None:
+                    self.inspect(fish)
+                elif world is not None:
+                    self.drop_food(world)
+
+            elif event.is_press and event.button == mouse.WHEEL_UP:
+                self.camera.set_zoom(self.camera.zoom // 2)
+
+            elif event.is_press and event.button == mouse.WHEEL_DOWN:
+                self.camera.set_zoom(self.camera.zoom * 2)
+
+            elif event.is_motion:
+                self.hover(event.pos)
+
+    def inspect(self, fish: Fish) -> None:
+        """ Show fish below the tank """
+
+        self._pending.append(
+            lambda: self._overlay_output.append(self.inspector.show(fish))
+        )
+
+    def hover(self, pos: Position) -> None:
+        """ Show the fish at screen pos below the tank, if it isn't shown yet """
+
+        self._pending.append(
+            lambda: self._overlay_output.append(self.inspector.hover(pos))
+        )
+
+    def drop_food(self, pos: Position) -> None:
+        """ Add food at world pos, if it is inside the tank """
+
+        if not self.aquarium.bounds.contains(pos):
+            return
+
+        self._pending.append(lambda: self.aquarium.add_food(pos))
+
+    def drop_food_burst(self) -> None:
+        """ Scatter FOOD_BURST pellets over the top quarter of the view """
+
+        startx, starty, endx, endy = self.camera.visible_bounds()
+        area = (
+            startx + 1,
+            starty + 1,
+            endx - startx - 1,
+            max((endy - starty) // 4, 1),
+        )
+
+        self._pending.append(lambda: self.aquarium.add_food_burst(FOOD_BURST, area))
+
+    def step_rewind(self, backwards: bool) -> None:
+        """ Queue a step through the rewind buffer """
+
+        if self.aquarium.rewind is None:
+            return
+
+        self._pending.append(lambda: self._step_rewind(backwards))
+
+    def _step_rewind(self, backwards: bool) -> None:
+        """ Step through the rewind buffer, resume when stepping past its end
+
+        This is run by the display thread, as it changes the tank & draws."""
+
+        rewind = self.aquarium.rewind
+        if rewind is None:
+            return
+
+        self.aquarium.pause()
+
+        if backwards:
+            rewind.step_back(self.aquarium)
+
+        elif not rewind.step_forward(self.aquarium):
+            self.aquarium.pause(False)
+            return
+
+        print(self.camera.render(), end="", flush=True)
 
     def show(self, menu: Type[Menu]) -> None:
         """ Show menu object """
 
         wipe()
         self.aquarium.pause()
+        print(mouse.DISABLE, end="", flush=True)
 
         menu(self)
 
         wipe()
+        print(mouse.ENABLE, end="", flush=True)
+        self.camera.invalidate()
         self.aquarium.pause(False)
 
     def generate_fish_properties(self) -> FishProperties:
         """ Generate random fish properties """
 
-        def get_random_from_generator(values: set[str]) -> str:
-            """Helper for getting random items"""
+        registry = get_registry()
+        names = registry.names()
 
-            items = list(values)
-            start = 0
-            end = len(items) - 1
+        species = names[randint(0, len(names) - 1)]
+        output: FishProperties = registry.random(species).properties()
 
-            return items[randint(start, end)]
+        return output
 
-        data = SPECIES_DATA
+    def open_journal(self) -> bool:
+        """ Start journaling to self.journal_path, return if tank was restored """
 
-        species = get_random_from_generator(data.keys())
-        variant = get_random_from_generator(data[species]["variants"].keys())
+        if self.journal_path is None:
+            return False
 
-        # this step could/should be automated
-        stages = data[species]["stages"]
-        _type = data[species]["type"]
+        seq = 0
+        restored = can_restore(self.journal_path)
+        if restored:
+            seq = restore(self.aquarium, self.journal_path)
+            log.info("restored tank from %s at seq %s", self.journal_path, seq)
+        else:
+            rotate(self.journal_path)
 
-        if _type == "top_dweller":
-            _type = FishType.TOP_DWELLER
+        self.aquarium.journal = Journal(
+            self.journal_path, checkpoint_interval=self.aquarium.fps * 60, seq=seq
+        )
 
-        elif _type == "mid_water":
-            _type = FishType.MID_WATER
+        return restored
 
-        elif _type == "bottom_dweller":
-            _type = FishType.BOTTOM_DWELLER
+    def close_journal(self) -> None:
+        """ Write final checkpoint & stop journal """
 
-        output: FishProperties = {
-            "pos": [0, 0],
-            "species": species,
-            "stages": stages,
-            "type": _type,
-            "variant": variant,
-            "name": "test",
-            "age": 0,
-        }
+        if self.aquarium.journal is None:
+            return
 
-        return output
+        self.aquarium.journal.close(self.aquarium.dump())
+        self.aquarium.journal = None
 
     def start(self, benchmark: Optional[bool] = False) -> None:
         """ Start the main loop of the program """
@@ -536,15 +821,21 @@ class InterfaceManager:
         wipe()
         hide_cursor()
 
-        for _ in range(10):
-            self.aquarium += Fish(self.aquarium, random_from(Molly))
+        restored = False
+        if self.aquarium.journal is None:
+            restored = self.open_journal()
+
+        species = get_registry()
+        if not restored:
+            self.aquarium.add_many(species.sample("Molly", 10 * self.world_scale**2))
 
         # for _ in range(5):
-        # self.aquarium += Fish(self.aquarium, random_from(Guppy))
+        # self.aquarium += Fish(self.aquarium, species.random("Guppy"))
 
         # for _ in range(5):
-        # self.aquarium += Fish(self.aquarium, random_from(Corydoras))
+        # self.aquarium += Fish(self.aquarium, species.random("Corydoras"))
 
         if not benchmark:
+            print(mouse.ENABLE, end="", flush=True)
             self._display_loop.start()
             self.getch_loop()
@@ -0,0 +1,196 @@
+"""
+fishtank.journal
+----------------
+author: bczsalba
+
+
+This module provides an append-only journal of state-changing Aquarium events.
+
+The journal is written as two files:
+
+- `<path>`: one compact JSON array per line, `[seq, tick, kind, uid, *data]`
+- `<path>.ckpt`: the last full checkpoint, `{"seq": int, "state": Aquarium.dump()}`
+
+Records are only appended to an in-memory deque on the simulation thread,
+formatting and file writes are done by a writer.BatchWriter in batches.
+Once a checkpoint is written the journal is truncated, as everything in it
+is already covered by the checkpoint.
+
+Restoring a tank is done by loading the checkpoint, then replaying every
+journal record with a `seq` above the checkpoint's. Closing the journal
+writes a final checkpoint, so a tank is restored exactly after a clean exit.
+Movement is not journaled: after a crash, objects are put back where their
+last record was made, not where they were when the tank stopped.
+
+A journal without a checkpoint can't be restored, and is rotated to
+`<path>.old` when a new one is started in its place.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+from collections import deque
+from typing import Any, Optional, TYPE_CHECKING
+
+from . import log
+from .writer import BatchWriter
+
+if TYPE_CHECKING:
+    from .classes import Aquarium
+
+# record kinds, kept to a single character to keep the journal small
+SPAWN = "S"
+DESTROY = "D"
+AGE = "A"
+TARGET = "T"
+
+
+class Journal:
+    """Buffered append-only event journal with periodic checkpoints"""
+
+    def __init__(
+        self,
+        path: str,
+        checkpoint_interval: int = 1500,
+        flush_interval: float = 0.5,
+        seq: int = 0,
+    ) -> None:
+        """Set up journal, start writer thread
+
+        checkpoint_interval is in ticks, flush_interval is in seconds.
+        seq should be the return value of restore() when continuing a journal."""
+
+        self.path = path
+        self.checkpoint_path = path + ".ckpt"
+        self.checkpoint_interval = checkpoint_interval
+        self.flush_interval = flush_interval
+
+        self._seq = seq
+        self._pending: deque[tuple[Any, ...]] = deque()
+        self._writer = BatchWriter(self._flush, flush_interval, "journal_writer")
+
+    def record(self, tick: int, kind: str, uid: int, *data: Any) -> None:
+        """Add a record to the write queue
+
+        This is called from the hot path, so it only stores a tuple."""
+
+        self._seq += 1
+        self._pending.append((self._seq, tick, kind, uid) + data)
+
+    def checkpoint_due(self, tick: int) -> bool:
+        """Return whether a checkpoint should be taken at tick"""
+
+        return tick % self.checkpoint_interval == 0
+
+    def checkpoint(self, state: dict[str, Any]) -> None:
+        """Queue a full checkpoint of state
+
+        state should be the result of Aquarium.dump(), and is only
+        serialized on the writer thread."""
+
+        self._pending.append((self._seq, state))
+        self._writer.wake()
+
+    def close(self, state: Optional[dict[str, Any]] = None) -> None:
+        """Write final checkpoint (if given) and stop writer thread"""
+
+        if state is not None:
+            self.checkpoint(state)
+
+        self._writer.close()
+
+    def _flush(self) -> None:
+        """Write all pending records & checkpoints"""
+
+        lines: list[str] = []
+        while self._pending:
+            item = self._pending.popleft()
+
+            # checkpoints are the only 2-long items
+            if len(item) == 2:
+                self._append(lines)
+                lines = []
+
+                seq, state = item
+                self._write_checkpoint(seq, state)
+                continue
+
+            lines.append(json.dumps(item, separators=(",", ":")))
+
+        self._append(lines)
+
+    def _append(self, lines: list[str]) -> None:
+        """Append lines to journal file with a single write"""
+
+        if len(lines) == 0:
+            return
+
+        with open(self.path, "a", encoding="utf-8") as journal_file:
+            journal_file.write("\n".join(lines) + "\n")
+
+    def _write_checkpoint(self, seq: int, state: dict[str, Any]) -> None:
+        """Atomically replace checkpoint file, then truncate journal"""
+
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump({"seq": seq, "state": state}, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+
+        os.replace(temp_path, self.checkpoint_path)
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+
+
+def read_records(path: str, after: int = 0) -> list[list[Any]]:
+    """Return all complete records in journal at path with seq > after"""
+
+    if not os.path.isfile(path):
+        return []
+
+    records = []
+    with open(path, "r", encoding="utf-8") as journal_file:
+        for line in journal_file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # the last line may be cut off by a crash
+                log.warning("skipping broken journal line %r", line)
+                continue
+
+            if record[0] > after:
+                records.append(record)
+
+    return records
+
+
+def can_restore(path: str) -> bool:
+    """Return whether there is a checkpoint to restore from at path"""
+
+    return os.path.isfile(path + ".ckpt")
+
+
+def rotate(path: str) -> None:
+    """Move journal at path out of the way, so records don't mix with a new one"""
+
+    if os.path.isfile(path):
+        os.replace(path, path + ".old")
+        log.info("moved journal without a checkpoint to %s.old", path)
+
+
+def restore(aquarium: Aquarium, path: str) -> int:
+    """Restore aquarium from checkpoint & journal tail, return last seq"""
+
+    with open(path + ".ckpt", "r", encoding="utf-8") as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+
+    aquarium.load(checkpoint["state"])
+
+    seq = checkpoint["seq"]
+    for record in read_records(path, after=seq):
+        seq, tick, kind, uid, *data = record
+        aquarium.ticks = tick
+        aquarium.apply_record(kind, uid, data)
+
+    return int(seq)
@@ -6,13 +6,19 @@ author: bczsalba
 
 This module generates the .ptg files used in the program's UI.
 
-It is run at every startup, but can be called manually: `fishtank --generate-layouts`
+It is run at every startup, but layouts are only regenerated when this file,
+the pytermgui version or the terminal's width changed since they were last
+generated. This is tracked by a hash stored next to them.
+
+Generation can be forced manually: `fishtank --generate-layouts`
 """
 
+import hashlib
 from os import mkdir
-from os.path import abspath, isdir
+from os.path import abspath, isdir, isfile
 from typing import Callable, Any
 
+import pytermgui
 from pytermgui.utils import width
 from pytermgui import (
     Container,
@@ -23,7 +29,10 @@ from pytermgui import (
     dump_to_file,
 )
 
-from . import to_local, dbg
+from . import to_local, log
+
+HASH_FILE = "layouts/.hash"
+LAYOUTS = ["layouts/newfish.ptg", "layouts/input_dialog.ptg", "layouts/info_page.ptg"]
 
 
 def generate_newfish_dialog() -> None:
@@ -80,7 +89,7 @@ def generate_newfish_dialog() -> None:
     data.set_style(Prompt, "delimiter_chars", lambda: None)
     cont.set_style(Prompt, "delimiter_chars", lambda: "<>")
 
-    dump_to_file(cont, to_local("layouts/newfish.ptg"))
+    dump_to_file(cont, to_local(LAYOUTS[0]))
 
 
 def generate_input_dialog() -> None:
@@ -98,7 +107,7 @@ def generate_input_dialog() -> None:
     infield.id = "inputfield_input"
     cont += infield
 
-    dump_to_file(cont, to_local("layouts/input_dialog.ptg"))
+    dump_to_file(cont, to_local(LAYOUTS[1]))
 
 
 def generate_info_page() -> None:
@@ -116,11 +125,39 @@ def generate_info_page() -> None:
     inner.id = "container_inner"
     cont += inner
 
-    dump_to_file(cont, to_local("layouts/info_page.ptg"))
+    dump_to_file(cont, to_local(LAYOUTS[2]))
+
+
+def get_hash() -> str:
+    """Return hash of everything the generated layouts depend on"""
+
+    with open(__file__, "rb") as source:
+        digest = hashlib.sha256(source.read())
+
+    digest.update(f"{getattr(pytermgui, '__version__', '')}:{width()}".encode())
+    return digest.hexdigest()
+
 
+def is_cached(layout_hash: str) -> bool:
+    """Return if all layouts exist and were generated with layout_hash"""
 
-def generate(output: Callable[..., Any] = print) -> None:
-    """Run all generators"""
+    if not all(isfile(to_local(layout)) for layout in LAYOUTS):
+        return False
+
+    try:
+        with open(to_local(HASH_FILE), "r", encoding="utf-8") as hash_file:
+            return hash_file.read() == layout_hash
+
+    except FileNotFoundError:
+        return False
+
+
+def generate(output: Callable[..., Any] = print, force: bool = False) -> None:
+    """Run all generators, unless the layouts are cached"""
+
+    layout_hash = get_hash()
+    if not force and is_cached(layout_hash):
+        return
 
     if not isdir(to_local("layouts")):
         mkdir(abspath(to_local("layouts")))
@@ -137,4 +174,7 @@ def generate(output: Callable[..., Any] = print) -> None:
             if output is print:
                 print("done!")
             else:
-                dbg(text + "done!")
+                log.debug("%sdone!", text)
+
+    with open(to_local(HASH_FILE), "w", encoding="utf-8") as hash_file:
+        hash_file.write(layout_hash)
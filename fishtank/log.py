@@ -0,0 +1,232 @@
+"""
+fishtank.log
+------------
+author: bczsalba
+
+
+This module provides a leveled, buffered logger.
+
+Calls below the logger's level return right away. Everything else is stored
+in a bounded deque as `(time, level, location, message, args)`, and only
+formatted (`message % args`) by a writer.BatchWriter, which appends everything
+pending to the log file with a single write every `flush_interval` seconds.
+If the writer falls behind by more than `capacity` records, the oldest ones
+are dropped and counted.
+
+The last `capacity` records are also kept in memory, see tail().
+
+The log is written to `$XDG_CACHE_HOME/fishtank/log` (`~/.cache/fishtank/log`
+when unset) by default, which can be changed with configure() or `--log FILE`.
+Every run of the tank calls rotate(), moving the last run's log to
+`<path>.old`, so the log doesn't grow across runs.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import atexit
+from time import time, strftime, localtime
+from collections import deque
+from typing import Any, Optional
+
+from .writer import BatchWriter
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+Record = tuple[float, int, str, str, tuple[Any, ...]]
+
+
+def default_path() -> str:
+    """Return path of the log file in the user's cache directory"""
+
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache, "fishtank", "log")
+
+
+def format_record(record: Record) -> str:
+    """Return record as a line of the log file"""
+
+    timestamp, level, location, message, args = record
+    if args:
+        try:
+            message = message % args
+        except (TypeError, ValueError):
+            message = " ".join([message] + [str(arg) for arg in args])
+
+    return (
+        strftime("%H:%M:%S", localtime(timestamp))
+        + f".{int(timestamp % 1 * 1000):03} {LEVEL_NAMES[level]:<7} {location} : "
+        + message
+    )
+
+
+class Logger:
+    """Leveled logger writing from a background thread"""
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        level: int = DEBUG,
+        capacity: int = 4096,
+        flush_interval: float = 0.5,
+    ) -> None:
+        """Set up object
+
+        The writer thread is only started by the first record."""
+
+        self.path = path if path is not None else default_path()
+        self.level = level
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        self._pending: deque[Record] = deque()
+        self._capacity = capacity
+        self._history: deque[Record] = deque(maxlen=capacity)
+        self._writer: Optional[BatchWriter] = None
+
+    def is_enabled(self, level: int) -> bool:
+        """Return whether records of level are kept"""
+
+        return level >= self.level
+
+    def log(self, level: int, message: str, *args: Any, depth: int = 1) -> None:
+        """Add a record, its location being depth frames above this call
+
+        message is only formatted with args by the writer thread."""
+
+        if level < self.level:
+            return
+
+        # pylint: disable=protected-access
+        frame = sys._getframe(depth)
+        location = f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno}"
+        record = (time(), level, location, message, args)
+
+        if len(self._pending) >= self._capacity:
+            self._pending.popleft()
+            self.dropped += 1
+
+        self._pending.append(record)
+        self._history.append(record)
+
+        if self._writer is None:
+            self._start()
+
+    def debug(self, message: str, *args: Any) -> None:
+        """Log at DEBUG level"""
+
+        self.log(DEBUG, message, *args, depth=2)
+
+    def info(self, message: str, *args: Any) -> None:
+        """Log at INFO level"""
+
+        self.log(INFO, message, *args, depth=2)
+
+    def warning(self, message: str, *args: Any) -> None:
+        """Log at WARNING level"""
+
+        self.log(WARNING, message, *args, depth=2)
+
+    def error(self, message: str, *args: Any) -> None:
+        """Log at ERROR level"""
+
+        self.log(ERROR, message, *args, depth=2)
+
+    def tail(self, count: int = 10) -> list[str]:
+        """Return the last count records, formatted"""
+
+        records = list(self._history)[-count:]
+        return [format_record(record) for record in records]
+
+    def _start(self) -> None:
+        """Start writer thread"""
+
+        self._writer = BatchWriter(self._flush, self.flush_interval, "log_writer")
+
+    def _flush(self) -> None:
+        """Append all pending records to the log file with a single write"""
+
+        lines = []
+        while self._pending:
+            lines.append(format_record(self._pending.popleft()) + "\n")
+
+        if len(lines) == 0:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        with open(self.path, "a", encoding="utf-8") as logfile:
+            logfile.write("".join(lines))
+
+    def close(self) -> None:
+        """Write everything pending and stop the writer thread"""
+
+        if self._writer is None:
+            return
+
+        self._writer.close()
+        self._writer = None
+
+
+LOGGER = Logger()
+atexit.register(LOGGER.close)
+
+
+def configure(path: Optional[str] = None, level: Optional[int] = None) -> None:
+    """Change path and/or level of the global logger
+
+    Records pending for the old path are written there first."""
+
+    if path is not None and path != LOGGER.path:
+        LOGGER.close()
+        LOGGER.path = path
+
+    if level is not None:
+        LOGGER.level = level
+
+
+def rotate() -> None:
+    """Move the log file to `<path>.old`, so the next record starts a new one
+
+    Records pending for the old file are written to it first."""
+
+    LOGGER.close()
+    if os.path.isfile(LOGGER.path):
+        os.replace(LOGGER.path, LOGGER.path + ".old")
+
+
+def debug(message: str, *args: Any) -> None:
+    """Log at DEBUG level to the global logger"""
+
+    if DEBUG >= LOGGER.level:
+        LOGGER.log(DEBUG, message, *args, depth=2)
+
+
+def info(message: str, *args: Any) -> None:
+    """Log at INFO level to the global logger"""
+
+    if INFO >= LOGGER.level:
+        LOGGER.log(INFO, message, *args, depth=2)
+
+
+def warning(message: str, *args: Any) -> None:
+    """Log at WARNING level to the global logger"""
+
+    if WARNING >= LOGGER.level:
+        LOGGER.log(WARNING, message, *args, depth=2)
+
+
+def error(message: str, *args: Any) -> None:
+    """Log at ERROR level to the global logger"""
+
+    if ERROR >= LOGGER.level:
+        LOGGER.log(ERROR, message, *args, depth=2)
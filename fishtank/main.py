@@ -5,43 +5,158 @@ author: bczsalba
 
 
 The main module behind fishtank.py.
+
+Most modules are only imported by the functions that need them, so that
+short-lived commands (like --help) and the first frame don't wait for
+imports they don't use.
 """
 
+# pylint: disable=import-outside-toplevel
 
-import os
 import sys
+from time import perf_counter
 from typing import Optional, Union
-from pytermgui.utils import hide_cursor, wipe
 
-from . import __version__, usage_data, dbg, to_local
-from .interface import InterfaceManager
-from .layout_generators import generate
-from .fish_generator import generate_fish
+from . import __version__, usage_data, log, IMPORT_TIME
+from .tracing import TRACER
+
+# options that are passed to main()
+RUN_OPTIONS = [
+    "-j",
+    "--journal",
+    "--record",
+    "--rewind",
+    "--trace",
+    "--profile",
+    "--metrics",
+    "--metrics-socket",
+    "--memory-budget",
+    "--log",
+    "--log-level",
+    "--startup-timing",
+    "--world-scale",
+]
 
 
 # pylint: disable=unused-argument
-def exit_program() -> None:
-    """Exit program in a clean manner"""
+def exit_program(message: Optional[str] = None) -> None:
+    """Exit program in a clean manner, printing message after clearing the screen"""
+
+    from pytermgui.utils import hide_cursor, wipe
 
     hide_cursor(0)
     wipe()
+
+    if message is not None:
+        print(message)
+
     sys.exit(0)
 
 
 # pylint: disable=invalid-name
-def main() -> None:
+def main(
+    journal_path: Optional[str] = None,
+    record_path: Optional[str] = None,
+    rewind_seconds: Optional[int] = None,
+    trace_path: Optional[str] = None,
+    profile_path: Optional[str] = None,
+    metrics_path: Optional[str] = None,
+    metrics_socket: Optional[str] = None,
+    memory_budget: Optional[int] = None,
+    startup_timing: bool = False,
+    world_scale: int = 1,
+) -> None:
     """main method"""
 
-    if not os.path.isfile(to_local("fishfile.py")):
-        print("generating")
-        generate_fish(to_local("data/species.json"))
+    timings = [("imports", perf_counter())]
+
+    # keep the log of the last run only
+    log.rotate()
+
+    from .species import get_registry
+
+    get_registry()
+    timings.append(("species", perf_counter()))
+
+    from .layout_generators import generate
+
+    generate(output=log.debug)
+    timings.append(("layouts", perf_counter()))
+
+    from .interface import InterfaceManager
+
+    timings.append(("interface import", perf_counter()))
+    log.info("starting interface...")
+    TRACER.enabled = trace_path is not None
+
+    profiler = None
+    if profile_path is not None:
+        from .profiler import SamplingProfiler
+
+        profiler = SamplingProfiler()
+        profiler.start()
+
+    manager = InterfaceManager(
+        journal_path=journal_path,
+        record_path=record_path,
+        rewind_seconds=rewind_seconds,
+        metrics_path=metrics_path,
+        metrics_socket=metrics_socket,
+        memory_budget=memory_budget,
+        world_scale=world_scale,
+    )
+    timings.append(("interface setup", perf_counter()))
+    manager.on_first_frame = lambda: timings.append(("first frame", perf_counter()))
+    manager.start()
+
+    if trace_path is not None:
+        TRACER.export(trace_path)
+
+    messages = []
+    if startup_timing:
+        messages.append(format_timings(timings))
 
-    open(to_local("log"), "w").close()
-    generate(output=dbg)
-    dbg("starting interface...")
-    InterfaceManager().start()
+    if profiler is not None and profile_path is not None:
+        profiler.stop()
+        profiler.write_collapsed(profile_path)
+        messages.append(profiler.summary())
+
+    log.info("thats all folks!")
+    exit_program("\n\n".join(messages) if messages else None)
+
+
+def format_timings(timings: list[tuple[str, float]]) -> str:
+    """Return table of (phase, end time) pairs, relative to importing fishtank"""
+
+    lines = ["startup timing, since fishtank was imported:"]
+
+    previous = IMPORT_TIME
+    for phase, end in timings:
+        lines.append(
+            f"  {phase:<18} {(end - IMPORT_TIME) * 1000:8.1f}ms"
+            + f" (+{(end - previous) * 1000:.1f}ms)"
+        )
+        previous = end
+
+    return "\n".join(lines)
+
+
+def play(path: str, speed: float = 1.0, start: int = 0) -> None:
+    """Play back a recording made with --record"""
+
+    from pytermgui.utils import hide_cursor, wipe
+    from .recorder import Player
+
+    player = Player(path)
+
+    wipe()
+    hide_cursor()
+
+    try:
+        player.play(start=start, speed=speed)
+    except KeyboardInterrupt:
+        pass
 
-    dbg("thats all folks!")
     exit_program()
 
 
@@ -63,11 +178,50 @@ def test_args(
     return False
 
 
+def get_value(short: str, long: str, args: list[str]) -> Optional[str]:
+    """Return the argument following short or long, exit if it is missing"""
+
+    index = test_args(short, long, args, return_index=True)
+    if index is None:
+        return None
+
+    if not index + 1 < len(args):
+        print(f"Not enough arguments to {long}!")
+        sys.exit(1)
+
+    return args[index + 1]
+
+
+def get_positive(long: str, args: list[str]) -> Optional[int]:
+    """Return the integer following long, exit if it is not at least 1"""
+
+    value = get_value("", long, args)
+    if value is None:
+        return None
+
+    if not value.isdigit() or int(value) < 1:
+        print(f"Argument to {long} has to be a positive integer!")
+        sys.exit(1)
+
+    return int(value)
+
+
 def cmdline() -> None:
     """Function to handle command line calling"""
 
     args = sys.argv[1:]
 
+    if (log_path := get_value("", "--log", args)) is not None:
+        log.configure(path=log_path)
+
+    if (level := get_value("", "--log-level", args)) is not None:
+        levels = {name: value for value, name in log.LEVEL_NAMES.items()}
+        if level.upper() not in levels:
+            print(f"Log level has to be one of {list(levels)}!")
+            sys.exit(1)
+
+        log.configure(level=levels[level.upper()])
+
     if len(args) == 0:
         main()
         sys.exit(0)
@@ -77,29 +231,83 @@ def cmdline() -> None:
         sys.exit(0)
 
     elif test_args("-g", "--generate-layouts", args):
-        generate(output=print)
-        sys.exit(0)
+        from .layout_generators import generate
 
-    elif (
-        index := test_args("-fg", "--generate-fish", args, return_index=True)
-    ) is not None:
-        if not index + 1 < len(args):
-            print("Not enough arguments!")
-            sys.exit(1)
-
-        generate_fish(args[index + 1])
+        generate(output=print, force=True)
+        sys.exit(0)
 
     elif (index := test_args("", "--benchmark", args, return_index=True)) is not None:
         num = None
         if index + 1 < len(args):
             try:
                 num = int(args[index + 1])
-            except TypeError:
+            except ValueError:
                 print("Argument to --benchmark has to be an integer!")
                 sys.exit(1)
 
+        from .interface import InterfaceManager
+
         InterfaceManager().benchmark(num)
 
+    elif test_args("", "--benchmark-suite", args):
+        from . import benchmark
+
+        scenarios = get_value("", "--scenario", args)
+
+        sys.exit(
+            benchmark.main(
+                json_path=get_value("", "--json", args),
+                baseline_path=get_value("", "--baseline", args),
+                names=scenarios.split(",") if scenarios is not None else None,
+                show_memory=bool(test_args("", "--memory", args)),
+            )
+        )
+
+    elif test_args("", "--microbench", args):
+        from . import microbench
+
+        names = get_value("", "--microbench", args)
+        sizes = get_value("", "--sizes", args)
+
+        microbench.main(
+            names=names.split(",") if names and not names.startswith("-") else None,
+            sizes=[int(size) for size in sizes.split(",")] if sizes else None,
+            json_path=get_value("", "--json", args),
+        )
+
+    elif (path := get_value("", "--play", args)) is not None:
+        speed = get_value("", "--speed", args) or "1"
+        start = get_value("", "--seek", args) or "0"
+
+        try:
+            speed_value, start_value = float(speed), int(start)
+        except ValueError:
+            speed_value, start_value = 0.0, -1
+
+        if not speed_value > 0 or start_value < 0:
+            print("--speed has to be a positive number, --seek a frame index!")
+            sys.exit(1)
+
+        play(path, speed=speed_value, start=start_value)
+
+    elif any(test_args("", opt, args) for opt in RUN_OPTIONS):
+        rewind = get_positive("--rewind", args)
+        budget = get_positive("--memory-budget", args)
+        scale = get_positive("--world-scale", args)
+
+        main(
+            journal_path=get_value("-j", "--journal", args),
+            record_path=get_value("", "--record", args),
+            rewind_seconds=rewind,
+            trace_path=get_value("", "--trace", args),
+            profile_path=get_value("", "--profile", args),
+            metrics_path=get_value("", "--metrics", args),
+            metrics_socket=get_value("", "--metrics-socket", args),
+            memory_budget=budget * 1024 * 1024 if budget is not None else None,
+            startup_timing=bool(test_args("", "--startup-timing", args)),
+            world_scale=scale if scale is not None else 1,
+        )
+
     else:
         print("not sure what to do with", args)
 
@@ -0,0 +1,142 @@
+"""
+fishtank.memory
+---------------
+author: bczsalba
+
+
+This module provides memory accounting for tanks.
+
+estimate() counts the objects of every accounted class in a tank, measures
+up to SAMPLE_SIZE of each with sys.getsizeof and extrapolates to the whole
+population. It is cheap enough to be called every second, which is how the
+Aquarium's memory budget is enforced.
+
+traced_sites() uses tracemalloc instead, and reports the lines inside fishtank
+that allocated the most memory. It is exact, but tracing slows everything
+down, so it is only used by the benchmarks.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Any, TYPE_CHECKING
+
+from .sprites import ATLAS, widths_nbytes
+
+if TYPE_CHECKING:
+    import tracemalloc
+    from .classes import Aquarium
+
+SAMPLE_SIZE = 64
+
+# accounted classes, in the order they are reported
+CLASSES = ["Fish", "Food", "Position", "Boundary", "path entries", "sprites", "grid"]
+
+
+def shallow_size(obj: Any) -> int:
+    """Return size of obj including its __dict__, if it has one"""
+
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+
+    return size
+
+
+def sampled_size(objects: list[Any], extra: int = 0) -> int:
+    """Return estimated total size of objects, each taking extra more bytes"""
+
+    if len(objects) == 0:
+        return 0
+
+    step = max(len(objects) // SAMPLE_SIZE, 1)
+    sample = objects[::step]
+    average = sum(shallow_size(obj) for obj in sample) / len(sample)
+
+    return int((average + extra) * len(objects))
+
+
+def estimate(aquarium: Aquarium) -> dict[str, dict[str, int]]:
+    """Return estimated count & size of each of CLASSES in aquarium
+
+    Every fish owns a position and a boundary of two more, and every path
+    entry a position. Positions shared between entries are counted for each
+    of them, so the estimate errs on the larger side. Food is only stored in
+    the arrays of aquarium.particles, which are measured directly."""
+
+    fish = list(aquarium.fish())
+    objects: list[Any] = fish
+
+    entries = sum(len(obj.path) for obj in objects)
+    boundaries = [obj.bounds for obj in objects if obj.bounds is not None]
+    positions = [pos for bounds in boundaries for pos in bounds.positions()]
+
+    entry_size = 0
+    for obj in objects:
+        if len(obj.path) > 0:
+            entry_size = sys.getsizeof(obj.path[0])
+            break
+
+    # lists owned by objects are accounted with them, path entries are
+    # counted once for the tuple and once for their pointer in the list
+    list_size = sys.getsizeof([])
+    position_count = len(objects) + len(positions) + entries
+    position_size = sampled_size(positions) // max(len(positions), 1)
+
+    report = {
+        "Fish": (
+            len(fish),
+            sampled_size(fish, extra=list_size),
+        ),
+        "Food": (len(aquarium.particles), aquarium.particles.nbytes()),
+        "Position": (position_count, position_count * position_size),
+        "Boundary": (len(boundaries), sampled_size(boundaries)),
+        "path entries": (entries, entries * (entry_size + 8)),
+        "sprites": (len(ATLAS), ATLAS.nbytes() + widths_nbytes()),
+        "grid": (len(aquarium.grid.cells), aquarium.grid.nbytes()),
+    }
+
+    return {
+        name: {"count": count, "bytes": size} for name, (count, size) in report.items()
+    }
+
+
+def total(report: dict[str, dict[str, int]]) -> int:
+    """Return total bytes of a report returned by estimate()"""
+
+    return sum(values["bytes"] for values in report.values())
+
+
+def format_report(report: dict[str, dict[str, int]]) -> list[str]:
+    """Return lines of a human-readable table of report"""
+
+    lines = []
+    for name in CLASSES:
+        values = report[name]
+        lines.append(
+            f"{name:<13} {values['count']:>7} {values['bytes'] / 1024:>9.1f}KiB"
+        )
+
+    lines.append(f"{'total':<13} {'':>7} {total(report) / 1024:>9.1f}KiB")
+    return lines
+
+
+def traced_sites(snapshot: tracemalloc.Snapshot, count: int = 10) -> dict[str, int]:
+    """Return the count lines inside fishtank with the most bytes allocated"""
+
+    # pylint: disable=import-outside-toplevel, redefined-outer-name
+    import tracemalloc
+
+    package = os.path.dirname(__file__)
+    snapshot = snapshot.filter_traces(
+        [tracemalloc.Filter(True, os.path.join(package, "*"))]
+    )
+
+    sites = {}
+    for stat in snapshot.statistics("lineno")[:count]:
+        frame = stat.traceback[0]
+        site = f"{os.path.relpath(frame.filename, package)}:{frame.lineno}"
+        sites[site] = stat.size
+
+    return sites
@@ -0,0 +1,268 @@
+"""
+fishtank.metrics
+----------------
+author: bczsalba
+
+
+This module exports metrics of a running tank in the OpenMetrics text format.
+
+The MetricsExporter either rewrites a file every `interval` seconds (for
+textfile collectors), or serves the metrics over HTTP on a local Unix socket:
+
+    curl --unix-socket /tmp/fishtank.sock http://localhost/metrics
+
+Frame times are observed on the display thread through observe(), everything
+else is read from the Aquarium when the metrics are rendered.
+"""
+
+from __future__ import annotations
+
+import os
+import gc
+import resource
+from bisect import bisect_left
+from collections import Counter
+from threading import Thread, Event as ThreadEvent
+from time import perf_counter
+from socketserver import ThreadingMixIn, UnixStreamServer
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .classes import Aquarium
+    from .stats import FrameStats
+
+# upper bounds of the frame time histogram, in seconds
+FRAME_BUCKETS = [0.001, 0.002, 0.005, 0.01, 0.016, 0.022, 0.033, 0.05, 0.1, 0.25]
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def get_rss() -> int:
+    """Return resident set size of the process in bytes"""
+
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    except (OSError, ValueError):
+        # not linux, fall back to the peak; ru_maxrss is in KiB on linux-likes
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """HTTP server listening on a Unix socket"""
+
+    daemon_threads = True
+    exporter: MetricsExporter
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serve the current metrics for any GET request"""
+
+    server: _UnixHTTPServer
+
+    # pylint: disable=invalid-name
+    def do_GET(self) -> None:
+        """Respond with metrics"""
+
+        body = self.server.exporter.render().encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        """Unix sockets have no client address"""
+
+        return "unix"
+
+    def log_message(self, *args: Any) -> None:  # pylint: disable=arguments-differ
+        """Don't print requests over the tank"""
+
+
+class MetricsExporter:
+    """Collect & export OpenMetrics text"""
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        aquarium: Aquarium,
+        frame_stats: FrameStats,
+        frame_budget: float,
+        interval: float = 10.0,
+    ) -> None:
+        """Set up object
+
+        Frames taking longer than frame_budget seconds are counted as dropped."""
+
+        self.aquarium = aquarium
+        self.frame_stats = frame_stats
+        self.frame_budget = frame_budget
+        self.interval = interval
+
+        self.frame_buckets = [0] * (len(FRAME_BUCKETS) + 1)
+        self.frame_count = 0
+        self.frame_sum = 0.0
+        self.dropped_frames = 0
+
+        self.gc_pauses = 0
+        self.gc_pause_seconds = 0.0
+        self._gc_start = 0.0
+
+        self._path: Optional[str] = None
+        self._server: Optional[_UnixHTTPServer] = None
+        self._thread: Optional[Thread] = None
+        self._stop = ThreadEvent()
+
+    def observe(self, frame_time: float) -> None:
+        """Add a frame's duration, called from the display loop"""
+
+        self.frame_buckets[bisect_left(FRAME_BUCKETS, frame_time)] += 1
+        self.frame_count += 1
+        self.frame_sum += frame_time
+
+        if frame_time > self.frame_budget:
+            self.dropped_frames += 1
+
+    def _on_gc(self, phase: str, _: dict[str, int]) -> None:
+        """gc.callbacks hook timing collections"""
+
+        if phase == "start":
+            self._gc_start = perf_counter()
+            return
+
+        self.gc_pauses += 1
+        self.gc_pause_seconds += perf_counter() - self._gc_start
+
+    def render(self) -> str:
+        """Return current metrics as OpenMetrics text"""
+
+        aquarium = self.aquarium
+        foods = len(aquarium.particles)
+
+        species: Counter[str] = Counter()
+        fish_types: Counter[str] = Counter()
+        for fish in list(aquarium.objects):
+            species[fish.species] += 1
+            fish_types[fish.type.name.lower()] += 1
+
+        lines = [
+            "# TYPE fishtank_ticks counter",
+            "# HELP fishtank_ticks Simulation ticks since start.",
+            f"fishtank_ticks_total {aquarium.ticks}",
+            "# TYPE fishtank_fps gauge",
+            "# HELP fishtank_fps Frames per second over the last few seconds.",
+            f"fishtank_fps {self.frame_stats.fps:.3f}",
+            "# TYPE fishtank_frame_seconds histogram",
+            "# UNIT fishtank_frame_seconds seconds",
+        ]
+
+        cumulative = 0
+        for bound, count in zip(FRAME_BUCKETS + [float("inf")], self.frame_buckets):
+            cumulative += count
+            label = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'fishtank_frame_seconds_bucket{{le="{label}"}} {cumulative}')
+
+        lines += [
+            f"fishtank_frame_seconds_count {self.frame_count}",
+            f"fishtank_frame_seconds_sum {self.frame_sum:.6f}",
+            "# TYPE fishtank_dropped_frames counter",
+            "# HELP fishtank_dropped_frames Frames that took longer than the budget.",
+            f"fishtank_dropped_frames_total {self.dropped_frames}",
+            "# TYPE fishtank_fish gauge",
+        ]
+
+        lines += [
+            f'fishtank_fish{{species="{name}"}} {count}'
+            for name, count in species.items()
+        ]
+        lines.append("# TYPE fishtank_fish_by_type gauge")
+        lines += [
+            f'fishtank_fish_by_type{{type="{name}"}} {count}'
+            for name, count in fish_types.items()
+        ]
+
+        lines += ["# TYPE fishtank_food gauge", f"fishtank_food {foods}"]
+
+        lines.append("# TYPE fishtank_events counter")
+        lines += [
+            f'fishtank_events_total{{event="{name.lower()}"}} {count}'
+            for name, count in list(aquarium.event_counts.items())
+        ]
+        lines.append("# TYPE fishtank_event_deliveries counter")
+        lines += [
+            f'fishtank_event_deliveries_total{{event="{name.lower()}"}} {count}'
+            for name, count in list(aquarium.fanout_counts.items())
+        ]
+
+        lines += [
+            "# TYPE fishtank_resident_memory_bytes gauge",
+            f"fishtank_resident_memory_bytes {get_rss()}",
+            "# TYPE fishtank_gc_pauses counter",
+            f"fishtank_gc_pauses_total {self.gc_pauses}",
+            "# TYPE fishtank_gc_pause_seconds counter",
+            f"fishtank_gc_pause_seconds_total {self.gc_pause_seconds:.6f}",
+            "# EOF",
+        ]
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Atomically replace path with the current metrics"""
+
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.render())
+
+        os.replace(temp_path, path)
+
+    def _write_loop(self) -> None:
+        """Write metrics file every interval seconds until stopped"""
+
+        assert self._path is not None
+
+        while not self._stop.wait(self.interval):
+            self.write(self._path)
+
+        self.write(self._path)
+
+    def start(
+        self, path: Optional[str] = None, socket_path: Optional[str] = None
+    ) -> None:
+        """Start writing to path, and/or serving on socket_path"""
+
+        gc.callbacks.append(self._on_gc)
+
+        if path is not None:
+            self._path = path
+            self._thread = Thread(target=self._write_loop, name="metrics_writer")
+            self._thread.daemon = True
+            self._thread.start()
+
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+            self._server = _UnixHTTPServer(socket_path, _MetricsHandler)
+            self._server.exporter = self
+            Thread(
+                target=self._server.serve_forever, name="metrics_server", daemon=True
+            ).start()
+
+    def stop(self) -> None:
+        """Stop all exporting, writing the file one last time"""
+
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            os.remove(str(self._server.server_address))
@@ -0,0 +1,302 @@
+"""
+fishtank.microbench
+-------------------
+author: bczsalba
+
+
+This module provides microbenchmarks for the primitives that dominate profiles.
+
+Every benchmark is a factory taking a `size` and returning the function to
+time. It is timed with timeit (which disables the garbage collector while
+timing), repeated a number of times, and reported as nanoseconds per call
+using both the fastest and the median repeat. Results are only comparable
+between runs using the same sizes.
+
+Usage: `fishtank --microbench [NAME,NAME] [--sizes 10,100] [--json OUT]`
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import random
+import timeit
+from statistics import median
+from typing import Any, Callable, Optional
+
+from .species import get_registry, mirror
+from .classes import Aquarium, Boundary, Fish, Position
+from .camera import Camera
+from .sprites import ATLAS
+from .timers import TimerWheel
+from .enums import AquariumEvent
+
+Benchmark = Callable[[int], Callable[[], Any]]
+
+DEFAULT_SIZES = [10, 100, 1000]
+REPEATS = 7
+
+
+def _make_tank(width: int, height: int) -> Aquarium:
+    """Return a tank that is never printed"""
+
+    aquarium = Aquarium(width=width, height=height)
+    aquarium.fps = 25
+
+    return aquarium
+
+
+def _make_fish(aquarium: Aquarium) -> Fish:
+    """Return a Molly added to aquarium"""
+
+    fish = Fish(aquarium, get_registry().random("Molly"))
+    aquarium += fish
+
+    return fish
+
+
+def _positions(size: int) -> list[Position]:
+    """Return size random positions"""
+
+    return [
+        Position(random.randint(0, 100), random.randint(0, 100)) for _ in range(size)
+    ]
+
+
+def bench_position_arithmetic(size: int) -> Callable[[], Any]:
+    """Position.__add__ & Position.__sub__"""
+
+    positions = _positions(size)
+    offset = Position(1, 1)
+
+    def call() -> None:
+        for pos in positions:
+            _ = pos + offset - offset
+
+    return call
+
+
+def bench_position_unpack(size: int) -> Callable[[], Any]:
+    """x, y = Position"""
+
+    positions = _positions(size)
+
+    def call() -> None:
+        for pos in positions:
+            _, _ = pos
+
+    return call
+
+
+def bench_boundary_error(size: int) -> Callable[[], Any]:
+    """Boundary.error"""
+
+    positions = _positions(size)
+    boundary = Boundary(Position(10, 10), Position(90, 90))
+
+    def call() -> None:
+        for pos in positions:
+            boundary.error(pos)
+
+    return call
+
+
+def bench_boundary_contains(size: int) -> Callable[[], Any]:
+    """Boundary.contains with Boundary arguments"""
+
+    boundary = Boundary(Position(10, 10), Position(90, 90))
+    others = [Boundary(pos, pos + Position(3, 0)) for pos in _positions(size)]
+
+    def call() -> None:
+        for other in others:
+            boundary.contains(other)
+
+    return call
+
+
+def bench_fish_get_path(size: int) -> Callable[[], Any]:
+    """Fish.get_path over a path of length size"""
+
+    aquarium = _make_tank(size + 20, 20)
+    fish = _make_fish(aquarium)
+    fish.pos = Position(2, 5)
+    target = Position(2 + size, 5)
+
+    return lambda: fish.get_path(target)
+
+
+def bench_species_mirror(size: int) -> Callable[[], Any]:
+    """species.mirror of a skin of length size"""
+
+    skin = ("><'(" * size)[:size]
+
+    return lambda: mirror(skin)
+
+
+def bench_fish_get_pigment(size: int) -> Callable[[], Any]:
+    """Fish.get_pigment of a skin of width size"""
+
+    fish = _make_fish(_make_tank(40, 20))
+    fish.prototype = fish.prototype.replace(
+        stages=[">" * size], pigment=[232, 234, 235, 247, 251], forced_pigment=None
+    )
+
+    return fish.get_pigment
+
+
+def bench_fish_repr(size: int) -> Callable[[], Any]:
+    """Fish.__repr__ (gradient) of a skin of width size
+
+    The sprite atlas is emptied before every call, so the sprite is built
+    each time, like before the atlas cached it."""
+
+    # pylint: disable=protected-access
+    fish = _make_fish(_make_tank(40, 20))
+    skin = ">" * size
+    fish._skins = skin, skin
+    fish.pigment = [random.choice([232, 242]) for _ in range(size)]
+
+    def call() -> str:
+        ATLAS.clear()
+        return repr(fish)
+
+    return call
+
+
+def bench_aquarium_fish_at(size: int) -> Callable[[], Any]:
+    """Aquarium.fish_at at a random position in a tank of size fish"""
+
+    aquarium = _make_tank(200, 60)
+    for _ in range(size):
+        _make_fish(aquarium)
+
+    # pylint: disable=protected-access
+    pos = aquarium._get_position_in_bounds()
+
+    return lambda: aquarium.fish_at(pos)
+
+
+def bench_camera_render(size: int) -> Callable[[], Any]:
+    """Camera.render of a 120x45 view into a 100x larger tank of size fish"""
+
+    aquarium = _make_tank(1200, 450)
+    aquarium.add_many(get_registry().sample("Molly", size))
+    camera = Camera(aquarium, 120, 45)
+
+    return camera.render
+
+
+def bench_aquarium_notify(size: int) -> Callable[[], Any]:
+    """Aquarium.notify of FOOD_DESTROYED in a tank of size fish"""
+
+    aquarium = _make_tank(200, 60)
+    for _ in range(size):
+        _make_fish(aquarium)
+
+    # the first call destroys the pellet, the rest only look for its followers
+    aquarium.add_food_burst(1)
+    food = next(aquarium.foods())
+
+    return lambda: aquarium.notify(AquariumEvent.FOOD_DESTROYED, food)
+
+
+def bench_food_step(size: int) -> Callable[[], Any]:
+    """FoodParticles.step of size sinking pellets, none of them stopping"""
+
+    aquarium = _make_tank(200, 60)
+    aquarium.add_food_burst(size)
+
+    startx, starty, endx, _ = aquarium.bounds
+    bounds = Boundary(Position(startx, starty), Position(endx, sys.maxsize))
+    particles = aquarium.particles
+
+    return lambda: particles.step(bounds)
+
+
+def bench_timers_advance(size: int) -> Callable[[], Any]:
+    """TimerWheel.advance with size timers waiting, none of them firing"""
+
+    timers = TimerWheel()
+    for i in range(size):
+        timers.schedule(sys.maxsize // 2 + i, lambda: None)
+
+    return timers.advance
+
+
+def bench_aquarium_nearest_food(size: int) -> Callable[[], Any]:
+    """Aquarium.nearest_food at a random position in a tank of size pellets"""
+
+    aquarium = _make_tank(200, 60)
+    aquarium.add_food_burst(size)
+
+    # pylint: disable=protected-access
+    pos = aquarium._get_position_in_bounds()
+
+    return lambda: aquarium.nearest_food(pos)
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    key[len("bench_") :]: value
+    for key, value in globals().items()
+    if key.startswith("bench_") and callable(value)
+}
+
+
+def run_benchmark(name: str, size: int, seed: int = 0) -> dict[str, float]:
+    """Time benchmark name at size, return ns per call"""
+
+    random.seed(seed)
+    function = BENCHMARKS[name](size)
+
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times = timer.repeat(repeat=REPEATS, number=number)
+
+    return {
+        "min_ns": min(times) / number * 1e9,
+        "median_ns": median(times) / number * 1e9,
+        "calls": number,
+    }
+
+
+def run(
+    names: Optional[list[str]] = None, sizes: Optional[list[int]] = None
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Run benchmarks (all of them by default), return results by name & size"""
+
+    if names is None:
+        names = list(BENCHMARKS)
+
+    if sizes is None:
+        sizes = DEFAULT_SIZES
+
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for name in names:
+        if name not in BENCHMARKS:
+            raise KeyError(f"Unknown benchmark {name}, choose from {list(BENCHMARKS)}")
+
+        results[name] = {}
+        for size in sizes:
+            results[name][str(size)] = result = run_benchmark(name, size)
+            print(
+                f"{name:<22} size={size:<6}",
+                f"min={result['min_ns']:>12.1f}ns",
+                f"median={result['median_ns']:>12.1f}ns",
+                file=sys.stderr,
+            )
+
+    return results
+
+
+def main(
+    names: Optional[list[str]] = None,
+    sizes: Optional[list[int]] = None,
+    json_path: Optional[str] = None,
+) -> None:
+    """Run benchmarks, write results as JSON to json_path if given"""
+
+    results = run(names, sizes)
+
+    if json_path is not None:
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=2)
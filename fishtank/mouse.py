@@ -0,0 +1,80 @@
+"""
+fishtank.mouse
+--------------
+author: bczsalba
+
+
+This module provides SGR mouse reporting.
+
+While enabled, the terminal reports mouse events as `ESC [ < b ; x ; y M`
+(or a trailing `m` for releases), with 1-based x & y. These are screen
+coordinates: they go through Camera.to_world before being used in the
+tank, and Camera.fish_at finds the fish shown at them.
+
+getch() returns everything pending on stdin at once, so a single key may
+hold several events when the mouse moves quickly; parse() returns all of
+them.
+"""
+
+from __future__ import annotations
+
+import re
+
+from .classes import Position
+
+# 1000: report clicks, 1003: report all motion, 1006: use the SGR encoding
+ENABLE = "\033[?1000h\033[?1003h\033[?1006h"
+DISABLE = "\033[?1006l\033[?1003l\033[?1000l"
+
+PREFIX = "\033[<"
+PATTERN = re.compile(r"\033\[<(\d+);(\d+);(\d+)([Mm])")
+
+LEFT = 0
+MIDDLE = 1
+RIGHT = 2
+WHEEL_UP = 64
+WHEEL_DOWN = 65
+
+# bits added to the button number by modifiers & motion
+MODIFIER_MASK = 4 | 8 | 16
+MOTION = 32
+
+
+class MouseEvent:
+    """A single mouse report"""
+
+    __slots__ = ("button", "pos", "is_press", "is_motion")
+
+    def __init__(self, code: int, pos: Position, is_press: bool) -> None:
+        """Set up object from the button code of the report"""
+
+        self.button = code & ~(MODIFIER_MASK | MOTION)
+        self.pos = pos
+        self.is_press = is_press
+        self.is_motion = bool(code & MOTION)
+
+    def is_click(self, button: int = LEFT) -> bool:
+        """Return if event is a press of button"""
+
+        return self.is_press and not self.is_motion and self.button == button
+
+    def __repr__(self) -> str:
+        """Stringify object"""
+
+        kind = "motion" if self.is_motion else "press" if self.is_press else "release"
+        return f"MouseEvent({kind}, button={self.button}, pos={self.pos})"
+
+
+def is_mouse(key: str) -> bool:
+    """Return if key returned by getch() holds mouse reports"""
+
+    return key.startswith(PREFIX)
+
+
+def parse(key: str) -> list[MouseEvent]:
+    """Return every mouse event in key, in the order they happened"""
+
+    return [
+        MouseEvent(int(code), Position(int(posx), int(posy)), kind == "M")
+        for code, posx, posy, kind in PATTERN.findall(key)
+    ]
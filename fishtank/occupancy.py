@@ -0,0 +1,198 @@
+"""
+fishtank.occupancy
+------------------
+author: bczsalba
+
+
+This module provides the occupancy grid of a tank.
+
+The grid stores the uid of the fish covering every cell of the tank in a
+flat array, 0 meaning the cell is empty. Fish update their cells whenever
+they move or change skins, which makes finding the fish at a position a
+single lookup, and lets fish check whether they would swim over another.
+
+When fish overlap, the one that moved into a cell last is stored in it,
+and the ones underneath are kept in a list for that cell. Fish leaving the
+cell hand it back to the ones below, so a cell is only empty once no fish
+covers it, and every fish covering an area is found by uids_in.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .classes import Boundary
+
+EMPTY = 0
+
+
+class OccupancyGrid:
+    """Flat array of the uids covering each cell of an area"""
+
+    def __init__(self, bounds: Boundary) -> None:
+        """Set up object covering bounds"""
+
+        self.startx = 0
+        self.starty = 0
+        self.width = 0
+        self.height = 0
+        self.cells = array("i")
+
+        # uids covered by the one in cells, by index, for overlapping cells
+        self.below: dict[int, list[int]] = {}
+
+        self.reset(bounds)
+
+    def reset(self, bounds: Boundary) -> None:
+        """Empty grid & resize it to cover bounds"""
+
+        self.startx, self.starty = bounds.start.x, bounds.start.y
+        self.width = max(bounds.end.x - bounds.start.x + 1, 0)
+        self.height = max(bounds.end.y - bounds.start.y + 1, 0)
+        self.cells = array("i", bytes(4 * self.width * self.height))
+        self.below = {}
+
+    def _span(self, posx: int, posy: int, width: int) -> tuple[int, int]:
+        """Return (start, end) indices of a row of width cells, clipped"""
+
+        row = posy - self.starty
+        if row < 0 or row >= self.height:
+            return 0, 0
+
+        start = posx - self.startx
+        end = start + width
+
+        # comparisons are noticeably faster than min() & max() here
+        # pylint: disable=consider-using-max-builtin, consider-using-min-builtin
+        if start < 0:
+            start = 0
+        if end > self.width:
+            end = self.width
+        if end < start:
+            end = start
+
+        offset = row * self.width
+        return offset + start, offset + end
+
+    def at(self, posx: int, posy: int) -> int:
+        """Return uid at a position, EMPTY if there is none"""
+
+        column, row = posx - self.startx, posy - self.starty
+        if not (0 <= column < self.width and 0 <= row < self.height):
+            return EMPTY
+
+        return self.cells[row * self.width + column]
+
+    def _cover(self, uid: int, index: int) -> None:
+        """Put uid on top of the cell at index"""
+
+        cells = self.cells
+        current = cells[index]
+        if current == uid:
+            return
+
+        if current != EMPTY:
+            self.below.setdefault(index, []).append(current)
+
+        cells[index] = uid
+
+    def _uncover(self, uid: int, index: int) -> None:
+        """Take uid off the cell at index, uncovering the one below it"""
+
+        below = self.below.get(index)
+        if below is None:
+            if self.cells[index] == uid:
+                self.cells[index] = EMPTY
+            return
+
+        if self.cells[index] == uid:
+            self.cells[index] = below.pop()
+        elif uid in below:
+            below.remove(uid)
+
+        if len(below) == 0:
+            del self.below[index]
+
+    def place(self, uid: int, posx: int, posy: int, width: int) -> None:
+        """Mark width cells starting at a position as covered by uid"""
+
+        for index in range(*self._span(posx, posy, width)):
+            self._cover(uid, index)
+
+    def remove(self, uid: int, posx: int, posy: int, width: int) -> None:
+        """Take uid off a row of width cells"""
+
+        for index in range(*self._span(posx, posy, width)):
+            self._uncover(uid, index)
+
+    def move(
+        self, uid: int, old: tuple[int, int, int], new: tuple[int, int, int]
+    ) -> None:
+        """Move uid from the (x, y, width) cells of old to those of new
+
+        Cells covered by both stay as they are, keeping uid below the fish
+        that covered it there."""
+
+        cells = self.cells
+        below = self.below
+        start, end = self._span(*new)
+        old_start, old_end = self._span(*old)
+
+        # cells nobody else covers are handled inline, as that's most of them
+        for index in range(old_start, old_end):
+            if start <= index < end:
+                continue
+
+            if index in below:
+                self._uncover(uid, index)
+            elif cells[index] == uid:
+                cells[index] = EMPTY
+
+        for index in range(start, end):
+            if old_start <= index < old_end:
+                continue
+
+            if cells[index] == EMPTY:
+                cells[index] = uid
+            else:
+                self._cover(uid, index)
+
+    def is_free(self, uid: int, posx: int, posy: int, width: int) -> bool:
+        """Return if no fish other than uid covers a cell of a row of width"""
+
+        start, end = self._span(posx, posy, width)
+        cells = self.cells[start:end]
+
+        free = cells.count(EMPTY)
+        if uid != EMPTY:
+            free += cells.count(uid)
+
+        return free == end - start
+
+    def uids_in(self, posx: int, posy: int, width: int, height: int) -> set[int]:
+        """Return uids covering any cell of a width x height area"""
+
+        uids: set[int] = set()
+        cells = self.cells
+        for row in range(posy, posy + height):
+            start, end = self._span(posx, row, width)
+            uids.update(cells[start:end])
+
+        startx, starty = posx - self.startx, posy - self.starty
+        for index, below in self.below.items():
+            row, column = divmod(index, self.width)
+            if startx <= column < startx + width and starty <= row < starty + height:
+                uids.update(below)
+
+        uids.discard(EMPTY)
+        return uids
+
+    def nbytes(self) -> int:
+        """Return size of the cell array & the lists of covered uids"""
+
+        return sys.getsizeof(self.cells) + sum(
+            sys.getsizeof(below) for below in self.below.values()
+        )
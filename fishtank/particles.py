@@ -0,0 +1,380 @@
+"""
+fishtank.particles
+------------------
+author: bczsalba
+
+
+This module provides the storage of a tank's food.
+
+Pellets are not objects: their uid, position, health and move counter are
+kept in parallel arrays, indexed by the pellet's slot. Sinking, drifting and
+stopping are done for all of them in a single pass by step(), so thousands
+of pellets cost one loop per tick.
+
+Sinking pellets are kept in the first slots, and pellets that stopped after
+them. step() only goes over the sinking ones, stopped pellets cost nothing
+until the timer the tank schedules for them removes them.
+
+Removing or stopping a pellet swaps others into its slot, so slots are only
+valid until the next change. Pellets are referred to by uid everywhere
+else, see classes.Food for the handle given to fish.
+
+Finding the pellet nearest to a position uses bins of BIN_SIZE x BIN_SIZE
+cells, which are built the first time they are needed after pellets moved.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from collections import defaultdict
+from random import random
+from typing import Any, Generator, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .classes import Boundary
+
+SKIN = "#"
+FOOD_HEALTH = 5
+
+# pellets move once per this many ticks
+MOVE_INTERVAL = 3
+
+# (x, y, is_stopped, health), laid out like the states of rewind
+State = tuple[int, int, int, int]
+
+BIN_SIZE = 8
+
+# pellet counts up to which nearest() checks every pellet instead of bins
+SCAN_LIMIT = 64
+
+
+class FoodParticles:
+    """Parallel arrays holding every pellet of a tank"""
+
+    def __init__(self) -> None:
+        """Set up object"""
+
+        self.uids = array("i")
+        self.xs = array("i")
+        self.ys = array("i")
+        self.health = array("i")
+        self.counters = array("i")
+
+        # pellets in slots below this are sinking
+        self.sinking = 0
+
+        self._slots: dict[int, int] = {}
+        self._bins: Optional[dict[tuple[int, int], list[int]]] = None
+
+    def __len__(self) -> int:
+        """Return count of pellets"""
+
+        return len(self.uids)
+
+    def __contains__(self, uid: int) -> bool:
+        """Return if there is a pellet with uid"""
+
+        return uid in self._slots
+
+    def _columns(self) -> tuple[array[int], ...]:
+        """Return every array"""
+
+        return self.uids, self.xs, self.ys, self.health, self.counters
+
+    def find(self, uid: int) -> Optional[int]:
+        """Return slot of pellet uid, None if it doesn't exist"""
+
+        return self._slots.get(uid)
+
+    def is_stopped(self, uid: int) -> bool:
+        """Return if pellet uid stopped sinking"""
+
+        return self._slots[uid] >= self.sinking
+
+    def _swap(self, first: int, second: int) -> None:
+        """Swap the pellets in two slots"""
+
+        if first == second:
+            return
+
+        for column in self._columns():
+            column[first], column[second] = column[second], column[first]
+
+        self._slots[self.uids[first]] = first
+        self._slots[self.uids[second]] = second
+
+    def add(
+        self,
+        uid: int,
+        posx: int,
+        posy: int,
+        health: int = FOOD_HEALTH,
+        counter: int = 0,
+        is_stopped: bool = False,
+    ) -> None:
+        """Add a pellet"""
+
+        self.xs.append(posx)
+        self.ys.append(posy)
+        self.health.append(health)
+        self.counters.append(counter)
+        self.uids.append(uid)
+        self._slots[uid] = len(self.uids) - 1
+
+        if not is_stopped:
+            self._swap(self.sinking, len(self.uids) - 1)
+            self.sinking += 1
+
+        self._bins = None
+
+    def set_stopped(self, uid: int, value: bool) -> None:
+        """Move pellet uid between the sinking & stopped slots"""
+
+        slot = self._slots[uid]
+        if value and slot < self.sinking:
+            self.sinking -= 1
+            self._swap(slot, self.sinking)
+
+        elif not value and slot >= self.sinking:
+            self._swap(slot, self.sinking)
+            self.sinking += 1
+
+    def remove(self, uid: int) -> bool:
+        """Remove pellet uid, return False if it doesn't exist"""
+
+        if uid not in self._slots:
+            return False
+
+        self.set_stopped(uid, True)
+        slot = self._slots.pop(uid)
+
+        last = len(self.uids) - 1
+        if slot != last:
+            self._slots[self.uids[last]] = slot
+
+        for column in self._columns():
+            column[slot] = column[last]
+            del column[last]
+
+        self._bins = None
+        return True
+
+    def clear(self) -> None:
+        """Remove every pellet"""
+
+        for column in self._columns():
+            del column[:]
+
+        self.sinking = 0
+        self._slots = {}
+        self._bins = None
+
+    def move(self, uid: int, posx: int, posy: int) -> None:
+        """Move pellet uid to a position"""
+
+        slot = self._slots[uid]
+        self.xs[slot] = posx
+        self.ys[slot] = posy
+        self._bins = None
+
+    def step(self, bounds: Boundary) -> list[int]:
+        """Move every sinking pellet, return uids of the ones that stopped
+
+        Pellets sink by a cell & drift by one to either side every
+        MOVE_INTERVAL ticks, then stop once they reach the bottom."""
+
+        startx, starty, endx, endy = bounds
+        xs, ys, counters = self.xs, self.ys, self.counters
+
+        stopped = []
+        has_moved = False
+
+        # going backwards, pellets that stop are swapped with ones already seen
+        for slot in range(self.sinking - 1, -1, -1):
+            counter = counters[slot] + 1
+            if counter < MOVE_INTERVAL:
+                counters[slot] = counter
+                continue
+
+            counters[slot] = 0
+            posy = ys[slot] + 1
+            if not starty < posy < endy:
+                stopped.append(self.uids[slot])
+                self.sinking -= 1
+                self._swap(slot, self.sinking)
+                continue
+
+            posx = xs[slot] + int(random() * 3) - 1
+            if startx < posx < endx:
+                xs[slot] = posx
+
+            ys[slot] = posy
+            has_moved = True
+
+        if has_moved:
+            self._bins = None
+
+        return stopped
+
+    def _get_bins(self) -> dict[tuple[int, int], list[int]]:
+        """Return slots of pellets by the bin they are in"""
+
+        if self._bins is not None:
+            return self._bins
+
+        bins: dict[tuple[int, int], list[int]] = defaultdict(list)
+        keys = zip(
+            [posx // BIN_SIZE for posx in self.xs],
+            [posy // BIN_SIZE for posy in self.ys],
+        )
+
+        for slot, key in enumerate(keys):
+            bins[key].append(slot)
+
+        self._bins = bins
+        return bins
+
+    def _closest(
+        self, posx: int, posy: int, slots: Any, best: tuple[int, Optional[int]]
+    ) -> tuple[int, Optional[int]]:
+        """Return (squared distance, slot) of the closest of slots, or best"""
+
+        xs, ys = self.xs, self.ys
+        distance, closest = best
+        for slot in slots:
+            offsetx, offsety = xs[slot] - posx, ys[slot] - posy
+            current = offsetx * offsetx + offsety * offsety
+            if current < distance:
+                distance, closest = current, slot
+
+        return distance, closest
+
+    def nearest(self, posx: int, posy: int) -> Optional[int]:
+        """Return uid of the pellet closest to a position, None if there is none
+
+        Bins are searched in growing squares around the position, until no
+        bin outside of the square could hold anything closer."""
+
+        count = len(self.uids)
+        if count == 0:
+            return None
+
+        best: tuple[int, Optional[int]] = sys.maxsize, None
+        if count > SCAN_LIMIT:
+            bins = self._get_bins()
+            binx, biny = posx // BIN_SIZE, posy // BIN_SIZE
+
+            ring = 0
+            while 8 * ring <= len(bins):
+                for key in _ring(binx, biny, ring):
+                    if key in bins:
+                        best = self._closest(posx, posy, bins[key], best)
+
+                # bins outside of the ring are at least ring * BIN_SIZE away
+                if best[1] is not None and best[0] <= (ring * BIN_SIZE) ** 2:
+                    return self.uids[best[1]]
+
+                ring += 1
+
+        # few pellets, or rings that would hold more empty bins than pellets
+        _, slot = self._closest(posx, posy, range(count), best)
+        return self.uids[slot] if slot is not None else None
+
+    def draw(self, text: str) -> str:
+        """Return string that writes text at every cell holding a pellet"""
+
+        return "".join(
+            f"\033[{posy};{posx}H" + text for posx, posy in set(zip(self.xs, self.ys))
+        )
+
+    def states(self) -> Generator[tuple[int, State], None, None]:
+        """Iterate (uid, state) of every pellet"""
+
+        sinking = self.sinking
+        for slot, (uid, posx, posy, health) in enumerate(
+            zip(self.uids, self.xs, self.ys, self.health)
+        ):
+            yield uid, (posx, posy, int(slot >= sinking), health)
+
+    def set_state(self, uid: int, state: tuple[int, ...]) -> None:
+        """Set position, stoppedness & health of pellet uid from a state"""
+
+        posx, posy, is_stopped, health = state
+        self.set_stopped(uid, bool(is_stopped))
+
+        slot = self._slots[uid]
+        self.xs[slot], self.ys[slot] = posx, posy
+        self.health[slot] = health
+
+        self._bins = None
+
+    def dump(self, uid: int, idle: int = 0) -> dict[str, Any]:
+        """Return a JSON-serializable representation of pellet uid
+
+        Stopped pellets don't count their idle time, it is passed in by the
+        owner of their despawn timer."""
+
+        slot = self._slots[uid]
+        is_stopped = slot >= self.sinking
+
+        return {
+            "kind": "food",
+            "uid": uid,
+            "health": self.health[slot],
+            "pos": [self.xs[slot], self.ys[slot]],
+            "counter": self.counters[slot],
+            "is_stopped": is_stopped,
+            "idle_framecount": idle if is_stopped else 0,
+        }
+
+    def load(self, data: dict[str, Any]) -> None:
+        """Add a pellet from its dump()"""
+
+        posx, posy = data["pos"]
+        self.add(
+            data["uid"],
+            posx,
+            posy,
+            health=data["health"],
+            counter=data["counter"],
+            is_stopped=data["is_stopped"],
+        )
+
+    def nbytes(self) -> int:
+        """Return size of the arrays & the slot index"""
+
+        return sum(sys.getsizeof(column) for column in self._columns()) + (
+            sys.getsizeof(self._slots)
+        )
+
+
+def dump_state(uid: int, state: State) -> dict[str, Any]:
+    """Return the dump() of a pellet with a state, its counters reset"""
+
+    posx, posy, is_stopped, health = state
+    return {
+        "kind": "food",
+        "uid": uid,
+        "health": health,
+        "pos": [posx, posy],
+        "counter": 0,
+        "is_stopped": bool(is_stopped),
+        "idle_framecount": 0,
+    }
+
+
+def _ring(binx: int, biny: int, ring: int) -> Generator[tuple[int, int], None, None]:
+    """Iterate bins on the edge of a square of ring bins around (binx, biny)"""
+
+    if ring == 0:
+        yield binx, biny
+        return
+
+    for posx in range(binx - ring, binx + ring + 1):
+        yield posx, biny - ring
+        yield posx, biny + ring
+
+    for posy in range(biny - ring + 1, biny + ring):
+        yield binx - ring, posy
+        yield binx + ring, posy
@@ -0,0 +1,132 @@
+"""
+fishtank.profiler
+-----------------
+author: bczsalba
+
+
+This module provides a sampling profiler, meant for the hot loops where
+deterministic profilers (cProfile) change the timing too much.
+
+A background thread wakes up every `interval` seconds, and walks the stack of
+every watched thread through sys._current_frames(). Stacks are counted, and
+can be written in the folded/collapsed format read by flamegraph tools:
+
+    thread;outer (file.py:12);inner (file.py:40) 27
+
+The overhead is fixed by the interval and the stack depth, rather than by the
+number of function calls made.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from time import sleep
+from types import CodeType, FrameType
+from collections import Counter
+from threading import Thread, enumerate as enumerate_threads
+from typing import Optional
+
+
+class SamplingProfiler:
+    """Timer-based stack sampler"""
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        thread_names: Optional[list[str]] = None,
+    ) -> None:
+        """Set up object
+
+        Only threads named in thread_names are sampled, by default these
+        are the display loop and the main (input) thread."""
+
+        if thread_names is None:
+            thread_names = ["display_loop", "MainThread"]
+
+        self.interval = interval
+        self.thread_names = thread_names
+        self.samples = 0
+
+        self._stacks: Counter[tuple[str, ...]] = Counter()
+        self._labels: dict[CodeType, str] = {}
+        self._is_running = False
+        self._thread = Thread(target=self._run, name="profiler")
+        self._thread.daemon = True
+
+    def start(self) -> None:
+        """Start sampling"""
+
+        self._is_running = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling"""
+
+        self._is_running = False
+        self._thread.join()
+
+    def _label(self, code: CodeType) -> str:
+        """Return cached label of code object"""
+
+        label = self._labels.get(code)
+        if label is None:
+            filename = os.path.basename(code.co_filename)
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+
+        return label
+
+    def _sample(self, frame: Optional[FrameType], thread_name: str) -> None:
+        """Count the stack ending at frame"""
+
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+
+        stack.append(thread_name)
+        stack.reverse()
+        self._stacks[tuple(stack)] += 1
+
+    def _run(self) -> None:
+        """Sample watched threads until stopped"""
+
+        # pylint: disable=protected-access
+        while self._is_running:
+            sleep(self.interval)
+
+            names = {
+                thread.ident: thread.name
+                for thread in enumerate_threads()
+                if thread.name in self.thread_names
+            }
+
+            for ident, frame in sys._current_frames().items():
+                if ident in names:
+                    self._sample(frame, names[ident])
+
+            self.samples += 1
+
+    def write_collapsed(self, path: str) -> None:
+        """Write folded stacks to path"""
+
+        with open(path, "w", encoding="utf-8") as outfile:
+            for stack, count in self._stacks.most_common():
+                outfile.write(";".join(stack) + f" {count}\n")
+
+    def summary(self, count: int = 15) -> str:
+        """Return the count functions with the most self-time samples"""
+
+        self_time: Counter[str] = Counter()
+        for stack, samples in self._stacks.items():
+            self_time[stack[-1]] += samples
+
+        total = sum(self_time.values()) or 1
+        lines = [
+            f"{self.samples} samples every {self.interval * 1000:g}ms, top self-time:"
+        ]
+        for label, samples in self_time.most_common(count):
+            lines.append(f"{samples / total:7.2%} {samples:7} {label}")
+
+        return "\n".join(lines)
@@ -0,0 +1,201 @@
+"""
+fishtank.recorder
+-----------------
+author: bczsalba
+
+
+This module records the rendered output of an Aquarium, and plays it back.
+
+Recordings are made up of frames, each being either a delta (the string
+View.update wrote) or a keyframe (View.get_keyframe(), a full redraw).
+A keyframe is stored every `keyframe_interval` frames, so getting to any frame
+only needs the closest keyframe before it and the deltas in between.
+
+File layout:
+
+    MAGIC
+    header length (uint32) + header (JSON)
+    frames: kind (uint8), raw length (uint32), data length (uint32) + zlib data
+    index: offset (uint64) of every frame
+    index offset (uint64) + MAGIC
+
+If the file is cut off (e.g. by a crash) the index is rebuilt by scanning.
+"""
+
+from __future__ import annotations
+
+import sys
+import json
+import zlib
+import struct
+from time import sleep
+from array import array
+from typing import BinaryIO, Callable, TextIO, Any
+
+MAGIC = b"FTREC\x01"
+
+KEYFRAME = 0
+DELTA = 1
+
+_FRAME_HEADER = struct.Struct(">BII")
+_UINT32 = struct.Struct(">I")
+_UINT64 = struct.Struct(">Q")
+
+
+class Recorder:
+    """Write frames of rendered output to a file"""
+
+    def __init__(self, path: str, fps: float, keyframe_interval: int = 60) -> None:
+        """Open file & write header"""
+
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.frame_count = 0
+
+        self._offsets = array("Q")
+        # frames are written as they come, the file is closed by close()
+        self._file: BinaryIO = open(path, "wb")  # pylint: disable=consider-using-with
+
+        header = json.dumps({"fps": fps, "keyframe_interval": keyframe_interval})
+        self._file.write(MAGIC)
+        self._file.write(_UINT32.pack(len(header)) + header.encode())
+
+    def add_frame(self, delta: str, get_keyframe: Callable[[], str]) -> None:
+        """Add a frame, calling get_keyframe when a keyframe is due
+
+        The keyframe has to represent the screen after delta was written."""
+
+        if self.frame_count % self.keyframe_interval == 0:
+            self._write(KEYFRAME, get_keyframe())
+        else:
+            self._write(DELTA, delta)
+
+    def _write(self, kind: int, frame: str) -> None:
+        """Compress & write a frame"""
+
+        raw = frame.encode()
+        data = zlib.compress(raw)
+
+        self._offsets.append(self._file.tell())
+        self._file.write(_FRAME_HEADER.pack(kind, len(raw), len(data)) + data)
+        self.frame_count += 1
+
+    def close(self) -> None:
+        """Write index and close file"""
+
+        index_offset = self._file.tell()
+
+        # offsets are stored big-endian, like the rest of the file
+        if sys.byteorder != "big":
+            self._offsets.byteswap()
+
+        self._file.write(self._offsets.tobytes())
+        self._file.write(_UINT64.pack(index_offset) + MAGIC)
+        self._file.close()
+
+
+class Player:
+    """Read & play back a recording made by Recorder"""
+
+    def __init__(self, path: str) -> None:
+        """Read header & frame index"""
+
+        with open(path, "rb") as recording:
+            self._data = recording.read()
+
+        if not self._data.startswith(MAGIC):
+            raise ValueError(f"{path} is not a fishtank recording!")
+
+        start = len(MAGIC)
+        (header_length,) = _UINT32.unpack_from(self._data, start)
+        start += _UINT32.size
+
+        header: dict[str, Any] = json.loads(self._data[start : start + header_length])
+        self.fps: float = header["fps"]
+        self.keyframe_interval: int = header["keyframe_interval"]
+
+        self._frames_start = start + header_length
+        self._offsets = self._read_index()
+
+    def __len__(self) -> int:
+        """Return number of frames"""
+
+        return len(self._offsets)
+
+    def _read_index(self) -> array[int]:
+        """Read frame index from footer, or rebuild it when missing"""
+
+        footer_length = _UINT64.size + len(MAGIC)
+        if self._data.endswith(MAGIC) and len(self._data) > footer_length:
+            (index_offset,) = _UINT64.unpack_from(
+                self._data, len(self._data) - footer_length
+            )
+
+            offsets = array("Q")
+            offsets.frombytes(
+                self._data[index_offset : len(self._data) - footer_length]
+            )
+            if sys.byteorder != "big":
+                offsets.byteswap()
+
+            return offsets
+
+        offsets = array("Q")
+        offset = self._frames_start
+        while offset + _FRAME_HEADER.size <= len(self._data):
+            _, _, length = _FRAME_HEADER.unpack_from(self._data, offset)
+            if offset + _FRAME_HEADER.size + length > len(self._data):
+                break
+
+            offsets.append(offset)
+            offset += _FRAME_HEADER.size + length
+
+        return offsets
+
+    def _read(self, index: int) -> str:
+        """Return contents of frame at index"""
+
+        offset = self._offsets[index]
+        _, _, length = _FRAME_HEADER.unpack_from(self._data, offset)
+
+        start = offset + _FRAME_HEADER.size
+        return zlib.decompress(self._data[start : start + length]).decode()
+
+    def frame_sizes(self) -> list[int]:
+        """Return uncompressed size of every frame in bytes"""
+
+        return [
+            _FRAME_HEADER.unpack_from(self._data, offset)[1] for offset in self._offsets
+        ]
+
+    def seek(self, index: int) -> str:
+        """Return string that draws the screen as it was at frame index"""
+
+        index = max(0, min(index, len(self) - 1))
+        keyframe = index - index % self.keyframe_interval
+
+        return "".join(self._read(i) for i in range(keyframe, index + 1))
+
+    def play(
+        self,
+        start: int = 0,
+        speed: float = 1.0,
+        output: TextIO = sys.stdout,
+    ) -> None:
+        """Play recording from frame start at speed times the recorded fps"""
+
+        if speed <= 0:
+            raise ValueError(f"Playback speed has to be positive, not {speed}.")
+
+        if len(self) == 0:
+            return
+
+        delay = 1 / (self.fps * speed)
+
+        output.write(self.seek(start))
+        output.flush()
+
+        for index in range(start + 1, len(self)):
+            sleep(delay)
+            output.write(self._read(index))
+            output.flush()
@@ -0,0 +1,215 @@
+"""
+fishtank.rewind
+---------------
+author: bczsalba
+
+
+This module provides a bounded buffer of past Aquarium states, for stepping
+backwards and forwards through the last few seconds of a tank.
+
+Every tick is stored as a delta against the tick before it:
+
+- moved: a flat `array("i")` of `uid, *old_state, *new_state` for every
+  object whose state (x, y, heading, age) changed
+- spawned & destroyed: the dump() of objects that appeared or disappeared
+
+Food has neither heading nor age, in their place its state holds whether it
+stopped & its health. Destroyed food is restored from its last state, with
+the counters of its movement reset.
+
+Deltas hold both the old and the new values, so they can be applied in either
+direction. The oldest deltas are dropped once either the memory budget or the
+maximum number of ticks is exceeded.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from typing import Any, TYPE_CHECKING
+
+from .particles import dump_state
+
+if TYPE_CHECKING:
+    from .classes import Aquarium, Fish
+
+State = tuple[int, int, int, int]
+
+# rough cost of a stored dump() in bytes, used for the memory budget
+_DUMP_SIZE = 512
+
+
+class Delta:
+    """Changes between two consecutive ticks"""
+
+    # pylint: disable=too-few-public-methods
+    def __init__(
+        self,
+        moved: array[int],
+        spawned: list[dict[str, Any]],
+        destroyed: list[dict[str, Any]],
+    ) -> None:
+        """Set up object"""
+
+        self.moved = moved
+        self.spawned = spawned
+        self.destroyed = destroyed
+        self.size = moved.itemsize * len(moved) + _DUMP_SIZE * (
+            len(spawned) + len(destroyed)
+        )
+
+
+def get_state(fish: Fish) -> State:
+    """Return compact state of fish"""
+
+    # pylint: disable=protected-access
+    posx, posy = fish.pos or (0, 0)
+    return posx, posy, fish._heading, fish.age
+
+
+def get_states(aquarium: Aquarium) -> tuple[dict[int, State], dict[int, Fish]]:
+    """Return states of every object in aquarium & its fish, by uid"""
+
+    states: dict[int, State] = {}
+    fish_by_uid: dict[int, Fish] = {}
+
+    for fish in aquarium.objects:
+        if fish.uid is not None:
+            states[fish.uid] = get_state(fish)
+            fish_by_uid[fish.uid] = fish
+
+    states.update(aquarium.particles.states())
+    return states, fish_by_uid
+
+
+class RewindBuffer:
+    """Ring buffer of per-tick deltas"""
+
+    def __init__(self, max_ticks: int, memory_budget: int = 8 * 1024 * 1024) -> None:
+        """Set up object
+
+        memory_budget is in bytes."""
+
+        self.max_ticks = max_ticks
+        self.memory_budget = memory_budget
+        self.size = 0
+
+        self._deltas: deque[Delta] = deque()
+        self._cursor = 0
+        self._has_baseline = False
+        self._prev: dict[int, State] = {}
+        self._prev_fish: dict[int, Fish] = {}
+
+    def __len__(self) -> int:
+        """Return number of stored ticks"""
+
+        return len(self._deltas)
+
+    @property
+    def offset(self) -> int:
+        """Return how many ticks behind the latest capture we are"""
+
+        return self._cursor
+
+    def capture(self, aquarium: Aquarium) -> None:
+        """Store delta between the previous capture and aquarium's current state"""
+
+        # the simulation was resumed while rewound, the future is discarded
+        if self._cursor > 0:
+            for _ in range(self._cursor):
+                self.size -= self._deltas.pop().size
+            self._cursor = 0
+
+        moved = array("i")
+        spawned = []
+        current, fish_by_uid = get_states(aquarium)
+
+        prev = self._prev
+        for uid, state in current.items():
+            old = prev.get(uid)
+            if old is None:
+                obj = fish_by_uid.get(uid)
+                spawned.append(
+                    obj.dump() if obj is not None else aquarium.particles.dump(uid)
+                )
+
+            elif old != state:
+                moved.append(uid)
+                moved.extend(old)
+                moved.extend(state)
+
+        destroyed = [
+            (
+                self._prev_fish[uid].dump()
+                if uid in self._prev_fish
+                else dump_state(uid, prev[uid])
+            )
+            for uid in prev
+            if uid not in current
+        ]
+
+        self._prev = current
+        self._prev_fish = fish_by_uid
+
+        # the first capture only sets up the state to compare against
+        if not self._has_baseline:
+            self._has_baseline = True
+            return
+
+        delta = Delta(moved, spawned, destroyed)
+        self._deltas.append(delta)
+        self.size += delta.size
+
+        while len(self._deltas) > self.max_ticks or (
+            self.size > self.memory_budget and len(self._deltas) > 1
+        ):
+            self.size -= self._deltas.popleft().size
+
+    def step_back(self, aquarium: Aquarium) -> bool:
+        """Undo one tick, return False if there is nothing left to undo"""
+
+        if self._cursor >= len(self._deltas):
+            return False
+
+        self._cursor += 1
+        delta = self._deltas[-self._cursor]
+        self._apply(aquarium, delta, backwards=True)
+
+        return True
+
+    def step_forward(self, aquarium: Aquarium) -> bool:
+        """Redo one tick, return False if already at the latest capture"""
+
+        if self._cursor == 0:
+            return False
+
+        delta = self._deltas[-self._cursor]
+        self._cursor -= 1
+        self._apply(aquarium, delta, backwards=False)
+
+        return True
+
+    def _apply(self, aquarium: Aquarium, delta: Delta, backwards: bool) -> None:
+        """Apply delta to aquarium in the given direction"""
+
+        removed, added = delta.spawned, delta.destroyed
+        if not backwards:
+            removed, added = added, removed
+
+        for data in removed:
+            gone = aquarium.find(data["uid"])
+            if gone is not None:
+                aquarium.remove(gone)
+
+        for data in added:
+            aquarium.load_object(data)
+
+        moved = delta.moved
+        start = 1 if backwards else 5
+
+        for i in range(0, len(moved), 9):
+            obj = aquarium.find(moved[i])
+            if obj is not None:
+                aquarium.set_state(obj, tuple(moved[i + start : i + start + 4]))
+
+        self._prev, self._prev_fish = get_states(aquarium)
@@ -0,0 +1,588 @@
+"""
+fishtank.species
+----------------
+author: bczsalba
+
+
+This module provides the registry of fish species, built from species.json.
+
+Every species has a number of entries a Fish can be created from: the
+species' defaults (named after the species), its variants and its specials.
+Entries are immutable Prototypes, shared by every fish created from them;
+fish themselves only store their own state, like position, age & pigment.
+Each prototype also draws a small pool of pigments the first time one is
+needed, which its fish pick from, so fish that look the same share sprites.
+
+Skins are drawn heading right. Prototypes mirror all of their stages once,
+by reversing them & swapping the characters of MIRROR_PAIRS with a
+str.translate table. Species can add their own pairs, or override the
+defaults, with a list of two-character strings:
+
+    "Molly": {"mirror": ["`'", "JL"], ...}
+
+    registry = get_registry()
+    fish = Fish(aquarium, registry.random("Molly"))
+    fish = Fish(aquarium, registry.get("Molly", "golden_panda"))
+    school = [Fish(aquarium, entry) for entry in registry.sample("Molly", 100)]
+
+Random entries are drawn as often as if every entry was equally likely,
+except that the species' variants share their part according to their
+"chance". These are cumulative percentages: in order of increasing chance,
+each variant gets the difference between its chance & the previous one's.
+Molly has 17 entries, 5 of them variants: its defaults & each of its
+specials are drawn 1 in 17 times, the variants 5 in 17 times between them,
+golden (5) being 5% of those. Each species precomputes a Walker alias table
+from these weights, making every draw O(1).
+
+Parsing the JSON is cached in a pickle in the user's cache directory, which
+is only rebuilt when the modification time and the hash of species.json
+don't match the cached ones.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import pickle
+import hashlib
+from random import random, choices
+from typing import Any, Iterator, Mapping, Optional
+
+from . import to_local, to_cache, log
+from .enums import FishType
+from .sprites import real_length
+
+# bump when the format of the cached entries changes
+CACHE_VERSION = 2
+
+# characters swapped when mirroring skins
+MIRROR_PAIRS = ("<>", "[]", "{}", "()", "/\\", "db", "qp")
+
+# count of pigments drawn for each prototype, shared between its fish
+PIGMENT_POOL_SIZE = 16
+
+Entries = dict[str, dict[str, Any]]
+PigmentPair = tuple[tuple[int, ...], tuple[int, ...]]
+
+
+def freeze(value: Any) -> Any:
+    """Return value with all of its lists turned into tuples"""
+
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+
+    return value
+
+
+def pigment_pair(pigment: tuple[int, ...]) -> PigmentPair:
+    """Return pigment & its reverse, used by left-headed fish"""
+
+    return pigment, pigment[::-1]
+
+
+def get_mirror_table(pairs: tuple[str, ...] = ()) -> dict[int, int]:
+    """Return str.translate table of MIRROR_PAIRS updated by pairs"""
+
+    key = MIRROR_PAIRS + pairs
+    table = _MIRROR_TABLES.get(key)
+    if table is not None:
+        return table
+
+    table = {}
+    for pair in key:
+        if len(pair) != 2:
+            raise ValueError(f"Mirror pair {pair!r} has to be two characters.")
+
+        first, second = ord(pair[0]), ord(pair[1])
+        table[first] = second
+        table[second] = first
+
+    _MIRROR_TABLES[key] = table
+    return table
+
+
+_MIRROR_TABLES: dict[tuple[str, ...], dict[int, int]] = {}
+
+
+def mirror(skin: str, table: Optional[dict[int, int]] = None) -> str:
+    """Return skin facing the other way"""
+
+    if table is None:
+        table = get_mirror_table()
+
+    return skin[::-1].translate(table)
+
+
+def build_entries(name: str, values: dict[str, Any]) -> Entries:
+    """Return all entries of a species, keyed by their id"""
+
+    base = {
+        key: freeze(value)
+        for key, value in values.items()
+        if key not in ["variants", "specials"]
+    }
+    base["species"] = name
+    base["type"] = FishType[base["type"].upper()]
+
+    entries = {name: base}
+    for group, key in [("variants", "variant"), ("specials", "name")]:
+        for entry_id, data in values.get(group, {}).items():
+            entry = dict(base)
+            entry.update({key: freeze(value) for key, value in data.items()})
+            entry[key] = entry_id
+
+            entries[entry_id] = entry
+
+    return entries
+
+
+class Prototype:
+    """Immutable properties shared by all fish of a species' entry
+
+    age is the age fish start out at, skins holds the (right, left) headed
+    skin of every stage."""
+
+    # pylint: disable=too-many-instance-attributes, too-many-arguments
+    FIELDS = (
+        "species",
+        "type",
+        "stages",
+        "age",
+        "variant",
+        "name",
+        "speed",
+        "pigment",
+        "forced_pigment",
+        "message",
+        "dominance",
+        "chance",
+        "mirror",
+    )
+
+    __slots__ = FIELDS + ("width", "skins", "_pigments")
+
+    species: str
+    type: FishType
+    stages: tuple[str, ...]
+    age: int
+    variant: Optional[str]
+    name: str
+    speed: Optional[int]
+    pigment: tuple[int, ...]
+    forced_pigment: Optional[tuple[int, ...]]
+    message: Optional[str]
+    dominance: Optional[int]
+    chance: Optional[int]
+    mirror: tuple[str, ...]
+    width: int
+    skins: tuple[tuple[str, str], ...]
+    _pigments: Optional[tuple[PigmentPair, ...]]
+
+    def __init__(
+        self,
+        species: str,
+        type: FishType,  # pylint: disable=redefined-builtin
+        stages: tuple[str, ...],
+        age: int = 0,
+        variant: Optional[str] = None,
+        name: str = "",
+        speed: Optional[int] = None,
+        pigment: tuple[int, ...] = (),
+        forced_pigment: Optional[tuple[int, ...]] = None,
+        message: Optional[str] = None,
+        dominance: Optional[int] = None,
+        chance: Optional[int] = None,
+        mirror: tuple[str, ...] = (),  # pylint: disable=redefined-outer-name
+    ) -> None:
+        """Set up object"""
+
+        # __setattr__ refuses changes, so slots are set through object's
+        object.__setattr__(self, "species", species)
+        object.__setattr__(self, "type", type)
+        object.__setattr__(self, "stages", stages)
+        object.__setattr__(self, "age", age)
+        object.__setattr__(self, "variant", variant)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "speed", speed)
+        object.__setattr__(self, "pigment", pigment)
+        object.__setattr__(self, "forced_pigment", forced_pigment)
+        object.__setattr__(self, "message", message)
+        object.__setattr__(self, "dominance", dominance)
+        object.__setattr__(self, "chance", chance)
+        object.__setattr__(self, "mirror", mirror)
+
+        object.__setattr__(
+            self, "width", max((real_length(stage) for stage in stages), default=0)
+        )
+        object.__setattr__(self, "_pigments", None)
+
+        table = get_mirror_table(mirror)
+        object.__setattr__(
+            self,
+            "skins",
+            tuple((stage, stage[::-1].translate(table)) for stage in stages),
+        )
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        """Disallow changes, as the object is shared"""
+
+        raise AttributeError(f"Cannot set {key!r}, Prototypes are immutable.")
+
+    def __repr__(self) -> str:
+        """Stringify object"""
+
+        entry = self.name or self.variant or "defaults"
+        return f"Prototype({self.species}, {entry})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Support pickling & copying despite __setattr__"""
+
+        return Prototype, self.key()
+
+    def key(self) -> tuple[Any, ...]:
+        """Return values of all fields, in order"""
+
+        return tuple(getattr(self, key) for key in self.FIELDS)
+
+    def properties(self) -> dict[str, Any]:
+        """Return a dictionary of all fields"""
+
+        return dict(zip(self.FIELDS, self.key()))
+
+    def replace(self, **changes: Any) -> Prototype:
+        """Return a copy with some fields changed"""
+
+        values = self.properties()
+        values.update({key: freeze(value) for key, value in changes.items()})
+        return Prototype(**values)
+
+    def random_pigment(self) -> PigmentPair:
+        """Return a random (pigment, reversed pigment) pair from the pool
+
+        The pool of PIGMENT_POOL_SIZE pigments is built on the first call,
+        drawing all of their colors at once. Fish with the same pair share
+        their sprites in the SpriteAtlas."""
+
+        pigments = self._pigments
+        if pigments is None:
+            pigments = self._build_pigments()
+            object.__setattr__(self, "_pigments", pigments)
+
+        return pigments[int(random() * len(pigments))]
+
+    def _build_pigments(self) -> tuple[PigmentPair, ...]:
+        """Return the pigment pool of this prototype"""
+
+        if self.forced_pigment is not None:
+            return (pigment_pair(self.forced_pigment),)
+
+        if len(self.pigment) == 0 or self.width == 0:
+            return (pigment_pair(()),)
+
+        width = self.width
+        colors = choices(self.pigment, k=width * PIGMENT_POOL_SIZE)
+
+        return tuple(
+            pigment_pair(tuple(colors[start : start + width]))
+            for start in range(0, len(colors), width)
+        )
+
+    @classmethod
+    def from_properties(cls, properties: Mapping[str, Any]) -> Prototype:
+        """Return the Prototype of properties
+
+        Prototypes with the same values are shared, and unknown keys raise
+        a TypeError."""
+
+        values = {key: freeze(value) for key, value in properties.items()}
+        if isinstance(values.get("type"), str):
+            values["type"] = FishType[values["type"].upper()]
+
+        prototype = cls(**values)
+        return _PROTOTYPES.setdefault(prototype.key(), prototype)
+
+
+_PROTOTYPES: dict[tuple[Any, ...], Prototype] = {}
+
+
+class AliasTable:
+    """Walker alias table for O(1) weighted draws of indices"""
+
+    def __init__(self, weights: list[float]) -> None:
+        """Set up object, weights being non-negative with a positive sum"""
+
+        count = len(weights)
+        weight_sum = sum(weights)
+        if count == 0 or weight_sum <= 0:
+            raise ValueError("AliasTable needs at least one positive weight.")
+
+        self.size = count
+        scaled = [weight * count / weight_sum for weight in weights]
+
+        # indices left in either list are 1.0 up to rounding errors
+        self.probabilities = [1.0] * count
+        self.aliases = list(range(count))
+
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def draw(self) -> int:
+        """Return a random index"""
+
+        value = random() * self.size
+        index = int(value)
+
+        if value - index < self.probabilities[index]:
+            return index
+
+        return self.aliases[index]
+
+    def draw_many(self, count: int) -> list[int]:
+        """Return count random indices"""
+
+        size = self.size
+        probabilities = self.probabilities
+        aliases = self.aliases
+
+        indices: list[int] = []
+        append = indices.append
+        for value in [random() * size for _ in range(count)]:
+            index = int(value)
+            append(index if value - index < probabilities[index] else aliases[index])
+
+        return indices
+
+
+def get_weights(entries: Entries) -> dict[str, float]:
+    """Return the weight of every entry, see the module docstring"""
+
+    count = len(entries)
+    weights = {entry_id: 1 / count for entry_id in entries}
+
+    chances = sorted(
+        (entry["chance"], entry_id)
+        for entry_id, entry in entries.items()
+        if entry.get("chance") is not None
+    )
+
+    if len(chances) == 0:
+        return weights
+
+    # the variants' share of the draws, split by the steps between chances
+    share = len(chances) / count / chances[-1][0]
+
+    previous = 0
+    for chance, entry_id in chances:
+        weights[entry_id] = (chance - previous) * share
+        previous = chance
+
+    return weights
+
+
+class Species:
+    """A single species & its entries"""
+
+    def __init__(self, name: str, entries: Entries) -> None:
+        """Set up object"""
+
+        self.name = name
+        self.type: FishType = entries[name]["type"]
+        self.entries = {
+            entry_id: Prototype.from_properties(entry)
+            for entry_id, entry in entries.items()
+        }
+        self.ids = tuple(self.entries)
+        self.variants = tuple(
+            entry_id
+            for entry_id, entry in entries.items()
+            if entry.get("variant") == entry_id
+        )
+
+        weights = get_weights(entries)
+        self._drawn = tuple(self.entries[entry_id] for entry_id in weights)
+        self._table = AliasTable(list(weights.values()))
+
+    def __repr__(self) -> str:
+        """Stringify object"""
+
+        return f"Species({self.name}, {len(self.ids)} entries)"
+
+    def get(self, entry_id: Optional[str] = None) -> Prototype:
+        """Return entry by id, the species' defaults by default"""
+
+        return self.entries[self.name if entry_id is None else entry_id]
+
+    def random(self) -> Prototype:
+        """Return a random entry, weighted by chance"""
+
+        return self._drawn[self._table.draw()]
+
+    def sample(self, count: int) -> list[Prototype]:
+        """Return count random entries, weighted by chance"""
+
+        drawn = self._drawn
+        return [drawn[index] for index in self._table.draw_many(count)]
+
+
+class SpeciesRegistry:
+    """Lookup of species & their entries"""
+
+    def __init__(self, entries: dict[str, Entries]) -> None:
+        """Set up object from the output of build_entries for every species"""
+
+        self._species = {
+            name: Species(name, species_entries)
+            for name, species_entries in entries.items()
+        }
+
+    def __getitem__(self, name: str) -> Species:
+        """Return species by name"""
+
+        return self._species[name]
+
+    def __iter__(self) -> Iterator[Species]:
+        """Iterate species"""
+
+        return iter(self._species.values())
+
+    def __len__(self) -> int:
+        """Return count of species"""
+
+        return len(self._species)
+
+    def names(self) -> list[str]:
+        """Return names of all species"""
+
+        return list(self._species)
+
+    def get(self, species: str, entry_id: Optional[str] = None) -> Prototype:
+        """Return entry of species by id"""
+
+        return self._species[species].get(entry_id)
+
+    def find(self, properties: Mapping[str, Any]) -> Optional[Prototype]:
+        """Return the entry a fish with properties was created from
+
+        Returns None if there is no such entry, or its stages have changed."""
+
+        species = self._species.get(properties["species"])
+        if species is None:
+            return None
+
+        entry_id = properties.get("name") or properties.get("variant")
+        prototype = species.entries.get(entry_id or species.name)
+        if prototype is None or list(prototype.stages) != list(properties["stages"]):
+            return None
+
+        return prototype
+
+    def random(self, species: str) -> Prototype:
+        """Return a random entry of species"""
+
+        return self._species[species].random()
+
+    def sample(self, species: str, count: int) -> list[Prototype]:
+        """Return count random entries of species"""
+
+        return self._species[species].sample(count)
+
+    def by_type(self) -> dict[FishType, list[str]]:
+        """Return species names grouped by their FishType"""
+
+        names: dict[FishType, list[str]] = {fish_type: [] for fish_type in FishType}
+        for species in self:
+            names[species.type].append(species.name)
+
+        return names
+
+
+def _read_cache(cache_path: str, mtime: int) -> Optional[dict[str, Any]]:
+    """Return cached data, None if there is no usable cache"""
+
+    try:
+        with open(cache_path, "rb") as cache_file:
+            cache = pickle.load(cache_file)
+
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return None
+
+    cache["is_current"] = cache["mtime"] == mtime
+    return cache
+
+
+def _write_cache(cache_path: str, cache: dict[str, Any]) -> None:
+    """Atomically write cache to cache_path"""
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path + ".tmp", "wb") as cache_file:
+            pickle.dump(cache, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(cache_path + ".tmp", cache_path)
+
+    except OSError as error:
+        log.warning("could not write species cache: %s", error)
+
+
+def load(
+    path: Optional[str] = None, cache_path: Optional[str] = None
+) -> SpeciesRegistry:
+    """Return registry of the species in path, using the cache when possible"""
+
+    if path is None:
+        path = to_local("data/species.json")
+
+    if cache_path is None:
+        cache_path = to_cache("species.pickle")
+
+    mtime = os.stat(path).st_mtime_ns
+    cache = _read_cache(cache_path, mtime)
+    if cache is not None and cache["is_current"]:
+        return SpeciesRegistry(cache["entries"])
+
+    with open(path, "rb") as species_file:
+        source = species_file.read()
+
+    digest = hashlib.sha256(source).hexdigest()
+
+    if cache is not None and cache["hash"] == digest:
+        entries = cache["entries"]
+    else:
+        log.info("building species registry from %s", path)
+        data = json.loads(source)
+        entries = {name: build_entries(name, values) for name, values in data.items()}
+
+    _write_cache(
+        cache_path,
+        {"version": CACHE_VERSION, "mtime": mtime, "hash": digest, "entries": entries},
+    )
+
+    return SpeciesRegistry(entries)
+
+
+_REGISTRY: Optional[SpeciesRegistry] = None
+
+
+def get_registry() -> SpeciesRegistry:
+    """Return the registry of the bundled species, loading it on first call"""
+
+    global _REGISTRY  # pylint: disable=global-statement
+
+    if _REGISTRY is None:
+        _REGISTRY = load()
+
+    return _REGISTRY
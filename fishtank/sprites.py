@@ -0,0 +1,126 @@
+"""
+fishtank.sprites
+----------------
+author: bczsalba
+
+
+This module provides the caches used while drawing fish.
+
+Pigmenting a skin with pytermgui.gradient is the most expensive part of
+drawing, while the result only depends on the skin and the pigment. The
+SpriteAtlas keeps rendered sprites, so they are only built once per skin,
+pigment & heading, and can be shared between fish that look the same.
+
+skin_width caches the printed width of skins, which would otherwise need
+their ANSI sequences stripped on every call.
+
+pytermgui reads the terminal's size when it is imported, so it is only
+imported once a sprite is built. Tanks that are never drawn can then be
+created without a terminal, e.g. in batch runs & tests.
+
+Both caches are bounded, and are emptied by clear_caches() when the tank's
+memory budget is exceeded.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+
+SpriteKey = tuple[str, tuple[int, ...]]
+
+# the patterns pytermgui.real_length strips & counts as two characters
+ANSI_PATTERN = re.compile(r"(?:\x1B[@-_]|[\x80-\x9F])[0-?]*[ -/]*[@-~]")
+UNICODE_PATTERN = re.compile(r"[^\u0000-\u007F]")
+
+
+class SpriteAtlas:
+    """Bounded cache of pigmented sprites"""
+
+    def __init__(self, max_size: int = 4096) -> None:
+        """Set up object
+
+        When max_size sprites are stored, the atlas is emptied before adding
+        the next one; fish that are still on screen rebuild theirs once."""
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._sprites: dict[SpriteKey, str] = {}
+
+    def __len__(self) -> int:
+        """Return count of stored sprites"""
+
+        return len(self._sprites)
+
+    def get(self, skin: str, pigment: tuple[int, ...]) -> str:
+        """Return skin colored by pigment, building it if needed"""
+
+        key = skin, pigment
+        sprite = self._sprites.get(key)
+
+        if sprite is not None:
+            self.hits += 1
+            return sprite
+
+        # pylint: disable=import-outside-toplevel
+        from pytermgui import gradient
+
+        self.misses += 1
+        if len(self._sprites) >= self.max_size:
+            self._sprites.clear()
+
+        sprite = self._sprites[key] = gradient(skin, list(pigment))
+        return sprite
+
+    def nbytes(self) -> int:
+        """Return approximate size of the stored sprites & their keys"""
+
+        return sys.getsizeof(self._sprites) + sum(
+            sys.getsizeof(sprite) + sys.getsizeof(pigment)
+            for (_, pigment), sprite in self._sprites.items()
+        )
+
+    def clear(self) -> None:
+        """Remove all sprites"""
+
+        self._sprites.clear()
+
+
+ATLAS = SpriteAtlas()
+
+_WIDTHS: dict[str, int] = {}
+MAX_WIDTHS = 4096
+
+
+def real_length(text: str) -> int:
+    """Return printed length of text, like pytermgui.real_length"""
+
+    return len(UNICODE_PATTERN.sub("**", ANSI_PATTERN.sub("", text)))
+
+
+def skin_width(skin: str) -> int:
+    """Return cached printed width of skin"""
+
+    width = _WIDTHS.get(skin)
+    if width is None:
+        if len(_WIDTHS) >= MAX_WIDTHS:
+            _WIDTHS.clear()
+
+        width = _WIDTHS[skin] = real_length(skin)
+
+    return width
+
+
+def widths_nbytes() -> int:
+    """Return approximate size of the width cache"""
+
+    return sys.getsizeof(_WIDTHS)
+
+
+def clear_caches() -> None:
+    """Empty all sprite caches"""
+
+    ATLAS.clear()
+    _WIDTHS.clear()
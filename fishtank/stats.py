@@ -0,0 +1,91 @@
+"""
+fishtank.stats
+--------------
+author: bczsalba
+
+
+Small helpers for summarizing timing samples.
+"""
+
+from math import sqrt, ceil
+from collections import deque
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return nearest-rank percentile of sorted values, fraction being in [0, 1]"""
+
+    if len(values) == 0:
+        return 0.0
+
+    index = max(ceil(fraction * len(values)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """Return mean, standard deviation, min, max and p50/p95/p99 of values"""
+
+    if len(values) == 0:
+        return {}
+
+    ordered = sorted(values)
+    mean = sum(ordered) / len(ordered)
+
+    return {
+        "mean": mean,
+        "std": sqrt(sum((value - mean) ** 2 for value in ordered) / len(ordered)),
+        "min": ordered[0],
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1],
+    }
+
+
+class FrameStats:
+    """Rolling window of per-frame timings"""
+
+    def __init__(self, size: int) -> None:
+        """Set up object, keeping the last size frames"""
+
+        self.frame_times: deque[float] = deque(maxlen=size)
+        self.sim_times: deque[float] = deque(maxlen=size)
+        self.render_times: deque[float] = deque(maxlen=size)
+        self.frame_bytes: deque[int] = deque(maxlen=size)
+        self.timestamps: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return number of frames in window"""
+
+        return len(self.frame_times)
+
+    # pylint: disable=too-many-arguments
+    def add(
+        self,
+        timestamp: float,
+        frame_time: float,
+        sim_time: float,
+        render_time: float,
+        frame_bytes: int,
+    ) -> None:
+        """Add a frame"""
+
+        self.timestamps.append(timestamp)
+        self.frame_times.append(frame_time)
+        self.sim_times.append(sim_time)
+        self.render_times.append(render_time)
+        self.frame_bytes.append(frame_bytes)
+
+    @property
+    def fps(self) -> float:
+        """Return frames per second over the window"""
+
+        if len(self.timestamps) < 2:
+            return 0.0
+
+        elapsed = self.timestamps[-1] - self.timestamps[0]
+        return (len(self.timestamps) - 1) / elapsed if elapsed else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """Return percentile of frame times in the window"""
+
+        return percentile(sorted(self.frame_times), fraction)
@@ -0,0 +1,113 @@
+"""
+fishtank.timers
+---------------
+author: bczsalba
+
+
+This module provides the timer wheel of a tank.
+
+Objects schedule callbacks some number of ticks in the future, instead of
+counting frames themselves every update. Timers are kept in a ring of
+slots, one per tick, hashed by the tick they are due at: advancing a tick
+only looks at a single slot, so waiting objects cost nothing until their
+timer fires. Timers more than a full turn away share their slot with nearer
+ones, and are skipped until their turn comes.
+
+Cancelled timers are only dropped once their slot is reached.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+WHEEL_SIZE = 256
+
+
+class Timer:
+    """A callback due at a tick of a TimerWheel"""
+
+    __slots__ = ("due", "callback", "args", "is_cancelled")
+
+    def __init__(self, due: int, callback: Callable[..., Any], args: tuple[Any, ...]):
+        """Set up object"""
+
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.is_cancelled = False
+
+    def cancel(self) -> None:
+        """Stop callback from being called"""
+
+        self.is_cancelled = True
+
+    def __repr__(self) -> str:
+        """Stringify object"""
+
+        name = getattr(self.callback, "__qualname__", repr(self.callback))
+        state = " cancelled" if self.is_cancelled else ""
+        return f"Timer({name}{self.args} at {self.due}{state})"
+
+
+class TimerWheel:
+    """Ring of slots holding the timers due at each tick"""
+
+    def __init__(self, size: int = WHEEL_SIZE) -> None:
+        """Set up object with size slots"""
+
+        self.tick = 0
+        self.fired = 0
+
+        self._slots: list[list[Timer]] = [[] for _ in range(size)]
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return count of timers that haven't been reached yet"""
+
+        return self._count
+
+    def schedule(self, delay: int, callback: Callable[..., Any], *args: Any) -> Timer:
+        """Call callback(*args) after delay ticks, at least one"""
+
+        timer = Timer(self.tick + max(delay, 1), callback, args)
+        self._slots[timer.due % len(self._slots)].append(timer)
+        self._count += 1
+
+        return timer
+
+    def remaining(self, timer: Timer) -> int:
+        """Return ticks left until timer is due"""
+
+        return timer.due - self.tick
+
+    def advance(self) -> int:
+        """Move to the next tick and run the callbacks due, return their count
+
+        Callbacks may schedule new timers, even ones due in a full turn."""
+
+        self.tick += 1
+        tick = self.tick
+
+        index = tick % len(self._slots)
+        slot = self._slots[index]
+        if len(slot) == 0:
+            return 0
+
+        due = [timer for timer in slot if timer.due <= tick]
+        self._slots[index] = [timer for timer in slot if timer.due > tick]
+        self._count -= len(due)
+
+        fired = 0
+        for timer in due:
+            if not timer.is_cancelled:
+                timer.callback(*timer.args)
+                fired += 1
+
+        self.fired += fired
+        return fired
+
+    def clear(self) -> None:
+        """Drop every timer"""
+
+        self._slots = [[] for _ in self._slots]
+        self._count = 0
@@ -0,0 +1,98 @@
+"""
+fishtank.tracing
+----------------
+author: bczsalba
+
+
+This module provides low-overhead tracing spans, exportable as Chrome trace JSON.
+
+Spans are recorded as:
+
+    start = TRACER.begin()
+    ...
+    TRACER.end("name", start)
+
+When the tracer is disabled begin() returns 0 and end() returns right away,
+so the hooks can stay in the hot paths. Finished spans go to a bounded ring
+buffer, so only the most recent `capacity` spans are kept.
+
+The output of export() can be opened in chrome://tracing or ui.perfetto.dev.
+"""
+
+from __future__ import annotations
+
+import os
+import json
+from time import perf_counter_ns
+from collections import deque
+from threading import get_ident, current_thread
+
+
+class Tracer:
+    """Ring buffer of timed spans"""
+
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        """Set up object"""
+
+        self.enabled = False
+        self._events: deque[tuple[str, int, int, int]] = deque(maxlen=capacity)
+        self._thread_names: dict[int, str] = {}
+
+    def begin(self) -> int:
+        """Return start time of a span, 0 if disabled"""
+
+        if not self.enabled:
+            return 0
+
+        return perf_counter_ns()
+
+    def end(self, name: str, start: int) -> None:
+        """Finish span started at start"""
+
+        if not start:
+            return
+
+        tid = get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = current_thread().name
+
+        self._events.append((name, tid, start, perf_counter_ns() - start))
+
+    def clear(self) -> None:
+        """Remove all recorded spans"""
+
+        self._events.clear()
+
+    def export(self, path: str) -> None:
+        """Write recorded spans to path in Chrome trace-event format"""
+
+        pid = os.getpid()
+        events: list[dict[str, object]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in self._thread_names.items()
+        ]
+
+        for name, tid, start, duration in list(self._events):
+            events.append(
+                {
+                    "name": name,
+                    "cat": "fishtank",
+                    "ph": "X",
+                    "ts": start / 1000,
+                    "dur": duration / 1000,
+                    "pid": pid,
+                    "tid": tid,
+                }
+            )
+
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+
+
+TRACER = Tracer()
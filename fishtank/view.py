@@ -0,0 +1,146 @@
+"""
+fishtank.view
+-------------
+author: bczsalba
+
+
+This module provides the views an Aquarium is drawn through.
+
+An Aquarium only simulates: creating or updating one never touches
+pytermgui's widgets, so headless tanks can be as large as memory allows.
+A view holds the bordered frame shown on screen, and after updating the
+tank composes everything that changed into a single string written to its
+output.
+
+TankView shows the whole tank at its own position, camera.Camera a
+scrollable, zoomable part of it.
+"""
+
+from __future__ import annotations
+
+import sys
+from abc import ABC, abstractmethod
+from time import perf_counter
+from typing import TextIO, TYPE_CHECKING
+
+from pytermgui import Container, padding_label
+
+from .particles import SKIN as FOOD_SKIN
+from .tracing import TRACER
+
+if TYPE_CHECKING:
+    from .classes import Aquarium
+
+
+class View(ABC):
+    """Base of the objects drawing an Aquarium"""
+
+    def __init__(self, aquarium: Aquarium) -> None:
+        """Set up object"""
+
+        self.aquarium = aquarium
+        self.output: TextIO = sys.stdout
+        self.last_frame = ""
+        self.render_time = 0.0
+
+        self._erasers: list[str] = []
+        self._is_invalid = True
+
+    def invalidate(self) -> None:
+        """Make next render() redraw the frame & everything inside it"""
+
+        self._is_invalid = True
+
+    @abstractmethod
+    def render(self) -> str:
+        """Return string that erases the last frame & draws the current one"""
+
+    @abstractmethod
+    def keyframe(self) -> str:
+        """Return string that draws the frame & everything inside it"""
+
+    def get_keyframe(self) -> str:
+        """Return string that redraws the view from a blank screen"""
+
+        return "\033[2J" + self.keyframe()
+
+    def update(self) -> None:
+        """Update the tank, write the frame to self.output
+
+        Nothing is written while the tank is paused. The frame is kept in
+        self.last_frame, and written with a single call. Time spent
+        rendering is stored in render_time."""
+
+        if not self.aquarium.update():
+            self.last_frame = ""
+            return
+
+        render_start = perf_counter()
+
+        start = TRACER.begin()
+        self.last_frame = self.render()
+        TRACER.end("show", start)
+
+        start = TRACER.begin()
+        self.output.write(self.last_frame)
+        self.output.flush()
+        TRACER.end("terminal write", start)
+
+        self.render_time = perf_counter() - render_start
+
+
+class TankView(View):
+    """Bordered frame drawing every object of an Aquarium
+
+    World coordinates are used as screen coordinates, so the frame is
+    placed at the tank's position & is as large as the tank."""
+
+    def __init__(self, aquarium: Aquarium) -> None:
+        """Set up object"""
+
+        super().__init__(aquarium)
+
+        self.frame = Container(width=aquarium.width, height=aquarium.height)
+        for i, char in enumerate("..''"):
+            self.frame.set_corner(i, char)
+
+        # the border takes up two rows of the height
+        for _ in range(aquarium.height - 2):
+            self.frame += padding_label
+
+        repr(self.frame)
+        self.frame.move(list(aquarium.pos))
+
+    def _draw_objects(self) -> tuple[list[str], list[str]]:
+        """Return strings that draw & erase every object"""
+
+        fish = self.aquarium.objects
+        particles = self.aquarium.particles
+
+        drawn = [obj.draw() for obj in fish]
+        drawn.append(particles.draw(FOOD_SKIN))
+
+        erased = [obj.erase() for obj in fish]
+        erased.append(particles.draw(" "))
+
+        return drawn, erased
+
+    def render(self) -> str:
+        """Return string that erases the last frame & draws the current one
+
+        Every object is erased before any of them is drawn, so that sprites
+        moving past eachother don't wipe one another."""
+
+        previous = self._erasers
+        drawn, self._erasers = self._draw_objects()
+
+        if self._is_invalid:
+            self._is_invalid = False
+            return repr(self.frame) + "".join(drawn)
+
+        return "".join(previous) + "".join(drawn)
+
+    def keyframe(self) -> str:
+        """Return string that draws the frame & everything inside it"""
+
+        return repr(self.frame) + "".join(self._draw_objects()[0])
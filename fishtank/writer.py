@@ -0,0 +1,59 @@
+"""
+fishtank.writer
+---------------
+author: bczsalba
+
+
+This module provides the background thread the log & the journal write with.
+
+Both only store records in a deque on the thread making them, and leave
+formatting & file writes to a BatchWriter. It calls their flush function
+every `flush_interval` seconds, or right away when woken up, and once more
+when closed, so nothing pending is lost.
+"""
+
+from __future__ import annotations
+
+from threading import Thread, Event as ThreadEvent
+from typing import Callable
+
+
+class BatchWriter:
+    """Thread calling flush every flush_interval seconds until closed"""
+
+    def __init__(
+        self, flush: Callable[[], None], flush_interval: float, name: str
+    ) -> None:
+        """Set up object, start thread"""
+
+        self.flush = flush
+        self.flush_interval = flush_interval
+
+        self._wakeup = ThreadEvent()
+        self._is_closed = False
+
+        self._thread = Thread(target=self._write_loop, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def wake(self) -> None:
+        """Make the next flush happen right away"""
+
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """Flush one last time and stop the thread"""
+
+        self._is_closed = True
+        self._wakeup.set()
+        self._thread.join()
+
+    def _write_loop(self) -> None:
+        """Call flush every flush_interval seconds, and once after closing"""
+
+        while not self._is_closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+        self.flush()
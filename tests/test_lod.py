@@ -0,0 +1,77 @@
+"""
+tests.test_lod
+--------------
+author: bczsalba
+
+
+Tests of the level-of-detail updates of fish far from the camera.
+"""
+
+from typing import Any, Optional
+
+import pytest
+
+from fishtank.classes import Aquarium, Fish, Position
+from fishtank.species import get_registry
+
+
+class FixedView:  # pylint: disable=too-few-public-methods
+    """Stands in for a Camera showing a fixed area of the tank"""
+
+    def __init__(self, area: tuple[int, int, int, int]) -> None:
+        """Set up object"""
+
+        self.area = area
+
+    def get_area(self, margin: int = 0) -> tuple[int, int, int, int]:
+        """Return area, grown by margin"""
+
+        posx, posy, width, height = self.area
+        return posx - margin, posy - margin, width + 2 * margin, height + 2 * margin
+
+
+def test_overlapping_fish_in_view_get_full_updates(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Every fish inside the view is updated every tick, even below others"""
+
+    aquarium = Aquarium(width=400, height=100)
+    aquarium.avoid_overlap = False
+
+    registry = get_registry()
+    shown = []
+    for _ in range(6):
+        fish = Fish(aquarium, registry.get("Molly"), pos=Position(30, 20))
+        aquarium += fish
+        shown.append(fish)
+
+    for posx in range(200, 390, 2):
+        aquarium += Fish(aquarium, registry.get("Molly"), pos=Position(posx, 80))
+
+    updated: list[Optional[int]] = []
+    coarse: list[Optional[int]] = []
+    full_update = Fish.update
+
+    def update(fish: Fish) -> Any:
+        updated.append(fish.uid)
+        return full_update(fish)
+
+    monkeypatch.setattr(Fish, "update", update)
+    monkeypatch.setattr(
+        Fish, "coarse_update", lambda fish, steps: coarse.append(fish.uid)
+    )
+
+    aquarium.camera = FixedView((20, 15, 30, 10))  # type: ignore[assignment]
+    for _ in range(aquarium.lod_interval):
+        # the fish keep swimming over eachother
+        for fish in shown:
+            fish.pos = Position(30, 20)
+
+        updated.clear()
+        aquarium.update()
+
+        for fish in shown:
+            assert updated.count(fish.uid) == 1
+            assert fish.uid not in coarse
+
+    assert len(coarse) > 0
@@ -0,0 +1,99 @@
+"""
+tests.test_occupancy
+--------------------
+author: bczsalba
+
+
+Tests of the occupancy grid & the lookups built on it.
+"""
+
+from fishtank.classes import Aquarium, Boundary, Fish, Position
+from fishtank.occupancy import EMPTY, OccupancyGrid
+from fishtank.species import get_registry
+
+
+def get_grid() -> OccupancyGrid:
+    """Return grid covering a 20x10 area"""
+
+    return OccupancyGrid(Boundary(Position(0, 0), Position(19, 9)))
+
+
+def test_cell_is_handed_back_when_covering_fish_moves() -> None:
+    """Fish below another keep their cells once it moves away"""
+
+    grid = get_grid()
+    grid.place(1, 2, 3, 4)
+    grid.place(2, 4, 3, 4)
+
+    assert grid.at(4, 3) == 2
+    grid.move(2, (4, 3, 4), (10, 3, 4))
+
+    assert [grid.at(column, 3) for column in range(2, 6)] == [1] * 4
+    assert grid.at(7, 3) == EMPTY
+    assert grid.at(10, 3) == 2
+
+
+def test_cell_is_empty_once_every_fish_left() -> None:
+    """A cell covered by several fish is only empty after all of them left"""
+
+    grid = get_grid()
+    for uid in [1, 2, 3]:
+        grid.place(uid, 5, 5, 3)
+
+    grid.remove(2, 5, 5, 3)
+    assert grid.at(5, 5) == 3
+
+    grid.remove(3, 5, 5, 3)
+    assert grid.at(5, 5) == 1
+
+    grid.remove(1, 5, 5, 3)
+    assert grid.at(5, 5) == EMPTY
+    assert not grid.below
+
+
+def test_uids_in_finds_covered_fish() -> None:
+    """Fish entirely covered by another are found in an area"""
+
+    grid = get_grid()
+    grid.place(1, 3, 3, 2)
+    grid.place(2, 2, 3, 5)
+
+    assert grid.uids_in(0, 0, 20, 10) == {1, 2}
+    assert grid.uids_in(10, 0, 10, 10) == set()
+
+
+def test_fish_at_finds_fish_left_by_overlapping_one() -> None:
+    """fish_at finds a fish after another one swam over it & away"""
+
+    aquarium = Aquarium(width=60, height=20)
+    registry = get_registry()
+
+    still = Fish(aquarium, registry.get("Molly"), pos=Position(10, 5))
+    passing = Fish(aquarium, registry.get("Molly"), pos=Position(11, 5))
+    aquarium += still
+    aquarium += passing
+
+    assert aquarium.fish_at(Position(11, 5)) is passing
+    passing.pos = Position(30, 12)
+
+    assert aquarium.fish_at(Position(11, 5)) is still
+    assert aquarium.fish_at(Position(30, 12)) is passing
+    assert set(aquarium.fish_in(0, 0, 60, 20)) == {still, passing}
+
+
+def test_fish_in_finds_covered_fish() -> None:
+    """fish_in returns fish hidden below others
+
+    Both when it looks up cells, and when it checks every fish."""
+
+    aquarium = Aquarium(width=60, height=20)
+    registry = get_registry()
+
+    below = Fish(aquarium, registry.get("Molly"), pos=Position(20, 8))
+    above = Fish(aquarium, registry.get("Molly"), pos=Position(20, 8))
+    aquarium += below
+    aquarium += above
+
+    assert aquarium.fish_at(Position(20, 8)) is above
+    assert aquarium.fish_in(20, 8, 1, 1) == [below, above]
+    assert aquarium.fish_in(0, 0, 60, 20) == [below, above]